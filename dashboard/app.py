@@ -3,8 +3,10 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import mysql.connector
+from mysql.connector import pooling
 from dotenv import load_dotenv
 import os
+import json
 from pathlib import Path
 import streamlit.components.v1 as components
 
@@ -26,6 +28,10 @@ st.title("Dashboard Qualidade da Água")
 BASE_DIR = Path(__file__).resolve().parent
 ENV_PATH = (BASE_DIR / ".." / ".env").resolve()
 load_dotenv(ENV_PATH)
+# Snapshot Parquet mantido pelo docker/db/scripts/snapshot.py a cada carga.
+SNAPSHOT_DIR = Path(
+    os.getenv("SNAPSHOT_DIR", BASE_DIR / ".." / "docker" / "db" / "snapshot")
+).resolve()
 
 
 def format_label(text, max_chars=12):
@@ -33,40 +39,101 @@ def format_label(text, max_chars=12):
     return t if len(t) <= max_chars else t[:max_chars] + "…"
 
 
-@st.cache_data
-def load_data():
-    conn = mysql.connector.connect(
+@st.cache_resource
+def get_pool():
+    # Um pool por processo do Streamlit, compartilhado por todas as sessões.
+    return pooling.MySQLConnectionPool(
+        pool_name="dashboard",
+        pool_size=int(os.getenv("DASHBOARD_POOL_SIZE", 4)),
         host=os.getenv("MYSQL_HOST"),
         user=os.getenv("MYSQL_USER"),
         password=os.getenv("MYSQL_PASSWORD"),
         database=os.getenv("MYSQL_DATABASE"),
         port=os.getenv("MYSQL_PORT", 3306),
     )
-    query = """
-        SELECT 
-            a.id AS amostra_id,
-            g.nome AS grupo,
-            l.nome AS local,
-            l.nome AS regiao,
-            l.latitude, l.longitude,
-            qa.temperatura_coleta,
-            qa.temperatura_analise,
-            qa.turbidez,
-            qa.ph_fita,
-            qa.ph_arduino,
-            qa.umidade
-        FROM amostras a
-        LEFT JOIN grupos g ON g.id = a.grupo_id
-        LEFT JOIN localizacao l ON l.id = a.localizacao_id
-        LEFT JOIN qualidade_agua qa ON qa.amostra_id = a.id
-        ORDER BY a.id;
-    """
-    df = pd.read_sql_query(query, conn)
-    conn.close()
-    return df
 
 
-df = load_data()
+def run_query(query, params=None):
+    conn = get_pool().get_connection()
+    try:
+        return pd.read_sql_query(query, conn, params=params)
+    finally:
+        # Devolve a conexão ao pool em vez de fechá-la.
+        conn.close()
+
+
+@st.cache_data(ttl=float(os.getenv("DASHBOARD_VERSION_TTL", 5)))
+def data_version():
+    # Sonda barata: amostras novas aumentam o MAX(id) da chave primária e as
+    # correções da ingestão atualizam o livro. O TTL evita uma sonda por clique.
+    version = run_query(
+        """
+        SELECT
+            (SELECT MAX(id) FROM amostras) AS ultimo_id,
+            (SELECT MAX(atualizado_em) FROM ingestao_linhas) AS atualizado_em;
+        """
+    )
+    # Mesmo formato gravado pelo snapshot.py em versao_dados do manifesto.
+    row = version.iloc[0]
+    return (
+        int(row["ultimo_id"]) if pd.notna(row["ultimo_id"]) else 0,
+        (
+            str(pd.Timestamp(row["atualizado_em"]))
+            if pd.notna(row["atualizado_em"])
+            else ""
+        ),
+    )
+
+
+SAMPLES_QUERY = """
+    SELECT 
+        a.id AS amostra_id,
+        a.grupo_id,
+        a.data_inclusao,
+        g.nome AS grupo,
+        l.nome AS local,
+        l.nome AS regiao,
+        l.latitude, l.longitude,
+        l.geohash,
+        qa.temperatura_coleta,
+        qa.temperatura_analise,
+        qa.turbidez,
+        qa.ph_fita,
+        qa.ph_arduino,
+        qa.umidade
+    FROM amostras a
+    LEFT JOIN grupos g ON g.id = a.grupo_id
+    LEFT JOIN localizacao l ON l.id = a.localizacao_id
+    LEFT JOIN qualidade_agua qa ON qa.amostra_id = a.id
+"""
+
+
+@st.cache_data(max_entries=2)
+def load_data(versao):
+    # versao só entra na chave do cache: a consulta grande roda de novo só
+    # quando os dados mudam. O cache_data calcula cada chave uma vez, então
+    # sessões que erram o cache ao mesmo tempo esperam pela mesma consulta.
+    return run_query(SAMPLES_QUERY + " ORDER BY a.id;")
+
+
+@st.cache_data(max_entries=2)
+def load_delta(ultimo_id, desde, versao):
+    # O que o snapshot ainda não tem: amostras acima da marca d'água dele e
+    # as corrigidas pela ingestão depois que ele foi gerado. Com o serviço de
+    # sensores gravando sem parar, é isso que vem do MySQL a cada versao.
+    df = run_query(
+        SAMPLES_QUERY
+        + """
+        WHERE a.id > %s
+           OR a.id IN (
+               SELECT amostra_id FROM ingestao_linhas WHERE atualizado_em > %s
+           )
+        ORDER BY a.id;
+        """,
+        (ultimo_id, desde or "1970-01-01 00:00:00"),
+    )
+    return df.assign(mes=pd.to_datetime(df["data_inclusao"]).dt.strftime("%Y-%m"))
+
 
 num_cols = [
     "temperatura_coleta",
@@ -77,8 +144,37 @@ num_cols = [
     "umidade",
 ]
 
-for col in num_cols:
-    df[col] = pd.to_numeric(df[col], errors="coerce")
+
+SNAPSHOT_COLUMNS = [
+    "amostra_id",
+    "grupo",
+    "local",
+    "regiao",
+    "latitude",
+    "longitude",
+    "geohash",
+    *num_cols,
+]
+
+
+def load_manifest():
+    path = SNAPSHOT_DIR / "_estado.json"
+    return json.loads(path.read_text()) if path.exists() else None
+
+
+@st.cache_data(max_entries=int(os.getenv("DASHBOARD_SNAPSHOT_CACHE", 16)))
+def load_snapshot(grupo_ids, meses, versao):
+    # versao só entra na chave do cache: cada carga no banco gera uma nova.
+    # Os filtros descartam pastas grupo_id=/mes= inteiras antes da leitura;
+    # as colunas são as mesmas do load_data, para o resto da página não mudar.
+    columns = SNAPSHOT_COLUMNS
+    if not grupo_ids or not meses:
+        return pd.DataFrame(columns=columns)
+    return pd.read_parquet(
+        SNAPSHOT_DIR,
+        columns=columns,
+        filters=[("grupo_id", "in", list(grupo_ids)), ("mes", "in", list(meses))],
+    )
 
 
 with st.sidebar:
@@ -453,9 +549,51 @@ else:
     with st.sidebar:
         st.header("Filtros")
 
-        grupos = st.multiselect(
-            "Grupo", df["grupo"].dropna().unique(), df["grupo"].dropna().unique()
-        )
+        manifest = load_manifest()
+        if manifest is None:
+            df = load_data(data_version())
+            grupos = st.multiselect(
+                "Grupo", df["grupo"].dropna().unique(), df["grupo"].dropna().unique()
+            )
+        else:
+            particoes = [
+                dict(chave.split("=") for chave in particao.split("/"))
+                for particao in manifest["particoes"]
+            ]
+            try:
+                delta = load_delta(
+                    manifest["ultimo_id"],
+                    manifest.get("versao_dados", [0, ""])[1],
+                    data_version(),
+                )
+            except mysql.connector.Error:
+                # Banco fora do ar: o snapshot, mesmo atrasado, é melhor que nada.
+                delta = pd.DataFrame(
+                    columns=[*SNAPSHOT_COLUMNS, "grupo_id", "mes"]
+                ).astype({"grupo_id": int})
+            nomes = {
+                manifest["grupos"][p["grupo_id"]]: int(p["grupo_id"]) for p in particoes
+            }
+            com_grupo = delta.dropna(subset=["grupo"])
+            nomes.update(zip(com_grupo["grupo"], com_grupo["grupo_id"].astype(int)))
+            meses_disp = sorted({p["mes"] for p in particoes} | set(delta["mes"]))
+            grupos = st.multiselect("Grupo", list(nomes), list(nomes))
+            meses = st.multiselect("Mês de inclusão", meses_disp, meses_disp)
+            ids = [nomes[g] for g in grupos]
+            df = load_snapshot(tuple(ids), tuple(meses), manifest["versao"])
+            if not delta.empty:
+                # As linhas do MySQL substituem as versões antigas do snapshot.
+                novas = delta[delta["grupo_id"].isin(ids) & delta["mes"].isin(meses)]
+                df = pd.concat(
+                    [
+                        df[~df["amostra_id"].isin(delta["amostra_id"])],
+                        novas[SNAPSHOT_COLUMNS],
+                    ],
+                    ignore_index=True,
+                ).sort_values("amostra_id", ignore_index=True)
+
+        for col in num_cols:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
 
         if len(grupos) == 0:
             regioes = st.multiselect("Região", [], [], disabled=True)
@@ -465,6 +603,16 @@ else:
             )
             regioes = st.multiselect("Região", regioes_disp, regioes_disp)
 
+        agrupamento = st.radio("Agrupar por", ["Região", "Célula geohash"])
+        precisao = st.slider(
+            "Precisão do geohash",
+            4,
+            9,
+            7,
+            disabled=agrupamento == "Região",
+            help="7 ≈ 150 x 150 m, 8 ≈ 38 x 19 m",
+        )
+
         top_n = st.slider("Quantidade de Tops", 3, 20, 10)
 
         filtros_numericos = {}
@@ -483,7 +631,13 @@ else:
     for col, (min_val, max_val) in filtros_numericos.items():
         df_filtered = df_filtered[df_filtered[col].between(min_val, max_val)]
 
-    df_region = df_filtered.groupby("regiao")[num_cols].mean().reset_index()
+    if agrupamento == "Região":
+        chave = df_filtered["regiao"]
+    else:
+        chave = df_filtered["geohash"].str[:precisao].fillna("sem coordenadas")
+    df_region = (
+        df_filtered.groupby(chave.rename("regiao"))[num_cols].mean().reset_index()
+    )
     df_region["regiao_label"] = df_region["regiao"].apply(lambda x: format_label(x, 12))
 
     label_fontsize = max(7, 12 - int(top_n / 3))
@@ -8,7 +8,8 @@ CREATE TABLE localizacao (
     nome VARCHAR(255),
     latitude DECIMAL(12,6),
     longitude DECIMAL(12,6),
-    descricao TEXT
+    descricao TEXT,
+    geohash VARCHAR(12)
 );
 
 CREATE TABLE amostras (
@@ -38,3 +39,14 @@ CREATE TABLE condutividade (
     condutividade DECIMAL(10,2),
     FOREIGN KEY (amostra_id) REFERENCES amostras(id)
 );
+
+CREATE TABLE ingestao_linhas (
+    origem VARCHAR(255) NOT NULL,
+    grupo_id INT NOT NULL,
+    numero_amostra INT NOT NULL,
+    impressao BIGINT NOT NULL,
+    amostra_id INT NOT NULL UNIQUE,
+    atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (origem, grupo_id, numero_amostra),
+    FOREIGN KEY (amostra_id) REFERENCES amostras(id)
+);
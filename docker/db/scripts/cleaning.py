@@ -0,0 +1,230 @@
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+KINDS = ("decimal", "coordinate", "integer")
+IGNORED = "Âº°Cc'\" \t"
+
+SKIP, DIGIT, SEPARATOR, MINUS, OTHER = range(5)
+ZERO = ord("0")
+POW10 = 10 ** np.arange(19, dtype=np.int64)
+MAX_DIGITS = 15
+
+
+def char_classes(ignored=IGNORED):
+    # Tabela de classes indexada pelo code point; tudo acima de 255 cai em OTHER.
+    table = np.full(257, OTHER, dtype=np.uint8)
+    table[0] = SKIP
+    table[ZERO : ZERO + 10] = DIGIT
+    table[[ord("."), ord(",")]] = SEPARATOR
+    table[ord("-")] = MINUS
+    table[[ord(char) for char in ignored if ord(char) < 256]] = SKIP
+    return table
+
+
+def parse_block(values, kind="decimal", ignored=IGNORED, degree_digits=2):
+    # Cada string vira uma linha de code points UCS-4 (uint32), e sinal, dígitos
+    # e separador decimal são resolvidos de uma vez com operações do numpy.
+    text = np.asarray(values, dtype=str)
+    if text.dtype.itemsize == 0:
+        return np.full(len(text), np.nan)
+    codes = text.view(np.uint32).reshape(len(text), -1)
+    classes = char_classes(ignored)[np.minimum(codes, 256)]
+
+    digit = classes == DIGIT
+    minus = classes == MINUS
+    # O menor tipo que conta até a largura da string sem dar a volta: uint8
+    # até 255 caracteres, que é o caso comum.
+    digits_seen = np.cumsum(digit, axis=1, dtype=np.min_scalar_type(codes.shape[1]))
+    n_digits = digits_seen[:, -1].astype(np.int64)
+    invalid = (classes == OTHER).any(axis=1)
+    invalid |= (minus & (digits_seen > 0)).any(axis=1) | (minus.sum(axis=1) > 1)
+    invalid |= (n_digits == 0) | (n_digits > MAX_DIGITS)
+    negative = (minus & (digits_seen == 0)).any(axis=1)
+
+    # O primeiro separador é a vírgula decimal, mesmo antes de qualquer dígito
+    # (".5" e ",5" valem 0,5).
+    point = classes == SEPARATOR
+    has_point = point.any(axis=1)
+    int_digits = np.where(
+        has_point, digits_seen[np.arange(len(codes)), point.argmax(axis=1)], n_digits
+    )
+    if kind == "integer":
+        # "4,0" ou "1.0" num campo inteiro é erro, não 40 ou 10.
+        invalid |= has_point
+    elif kind == "decimal":
+        invalid |= point.sum(axis=1) > 1
+    elif kind == "coordinate":
+        # -45.452.470: o primeiro ponto separa os graus e os demais são
+        # agrupamentos; -22413165 (sem ponto) ganha o ponto após os graus.
+        int_digits = np.where(~has_point & (n_digits >= 7), degree_digits, int_digits)
+    else:
+        raise ValueError(f"Tipo inválido: {kind} (opções: {KINDS})")
+
+    place = np.clip(n_digits[:, None] - digits_seen, 0, len(POW10) - 1)
+    weights = (codes.astype(np.int64) - ZERO) * POW10[place]
+    mantissa = np.where(digit, weights, 0).sum(axis=1)
+    frac_digits = np.clip(n_digits - int_digits, 0, len(POW10) - 1)
+    result = mantissa / POW10[frac_digits].astype(np.float64)
+    result[negative] *= -1
+    result[invalid] = np.nan
+    return result
+
+
+def to_float(series, kind="decimal", ignored=IGNORED, block_size=500_000):
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(np.float64)
+
+    # Planilhas repetem muito os mesmos textos ("25ºC", "6"): um único hash
+    # da coluna, parse só dos valores distintos e um take para expandir.
+    codes, uniques = pd.factorize(series)
+    uniques = np.asarray(uniques, dtype=object)
+    parsed = [
+        parse_block(uniques[start : start + block_size], kind, ignored)
+        for start in range(0, len(uniques), block_size)
+    ]
+    # O código -1 (NaN/None) cai na última posição.
+    parsed = np.concatenate([*parsed, [np.nan]])
+    return pd.Series(parsed[codes], index=series.index, name=series.name)
+
+
+def clean(df, columns, block_size=500_000):
+    # Cópia rasa: as colunas limpas substituem as originais só no retorno.
+    df = df.copy(deep=False)
+    for column, kind in columns.items():
+        values = to_float(df[column], kind, block_size=block_size)
+        if kind == "integer":
+            bad = values.isna()
+            if bad.any():
+                raise ValueError(
+                    f"{column}: valores inválidos nas linhas "
+                    f"{list(values.index[bad][:10])}"
+                )
+            values = values.astype(np.int64)
+        df[column] = values
+    return df
+
+
+def legacy_clean(df):
+    # Cadeias de str.replace do init.py original, mantidas para o benchmark.
+    df = df.copy()
+    for col in ["Ph(Arduino)", "Ph(Fita)", "Umidade(%)", "Turbidez(NTU)"]:
+        df[col] = df[col].astype(str).str.replace(",", ".", regex=False)
+        df[col] = df[col].str.strip().astype(float)
+    for col in ["Temperatura_Coleta", "Temperatura_Analise"]:
+        series = df[col].astype(str)
+        for char in ["Â", "º", "°", "C", "c", " "]:
+            series = series.str.replace(char, "", regex=False)
+        df[col] = series.str.replace(",", ".", regex=False).astype(float)
+    series = df["Grupo"].astype(str)
+    for char in [",", " ", '"', "'"]:
+        series = series.str.replace(char, "", regex=False)
+    df["Grupo"] = series.str.strip().astype(int)
+    for col in ["Latitude", "Longitude"]:
+        series = df[col].astype(str)
+        for char in ["Â", "º", "°", "'"]:
+            series = series.str.replace(char, "", regex=False)
+        series = series.str.replace(",", ".", regex=False)
+        series.loc[series.str.match(r"^-?\d{7,9}$")] = series.str.replace(
+            r"(-?\d{2})(\d+)", r"\1.\2", regex=True
+        )
+        series = series.str.replace("..", ".", regex=False)
+        df[col] = series.str.replace(r"\.(?=.*\.)", "", regex=True).astype(float)
+    return df
+
+
+COLUMNS = {
+    "Grupo": "integer",
+    "Latitude": "coordinate",
+    "Longitude": "coordinate",
+    "Temperatura_Coleta": "decimal",
+    "Temperatura_Analise": "decimal",
+    "Ph(Arduino)": "decimal",
+    "Ph(Fita)": "decimal",
+    "Turbidez(NTU)": "decimal",
+    "Umidade(%)": "decimal",
+}
+
+
+def synthetic_sheet(rows, seed=0):
+    # Valores aleatórios nos formatos que aparecem nas planilhas reais; as
+    # coordenadas são quase todas distintas, o pior caso para o motor.
+    rng = np.random.default_rng(seed)
+
+    def pick(options):
+        return np.array(options, dtype=object)[rng.integers(0, len(options), rows)]
+
+    def decimal(low, high, digits):
+        text = pd.Series(np.round(rng.uniform(low, high, rows), digits).astype(str))
+        comma = rng.random(rows) < 0.5
+        text[comma] = text[comma].str.replace(".", ",", regex=False)
+        return text
+
+    def coordinate(column, center):
+        degrees = center + rng.uniform(-0.01, 0.01, rows)
+        micro = np.abs(np.round(degrees * 1e6)).astype(np.int64)
+        expected[column] = -micro / 1e6
+        micro = pd.Series(micro.astype(str))
+        dotted = micro.str[:2] + "." + micro.str[2:]
+        grouped = micro.str[:2] + "." + micro.str[2:5] + "." + micro.str[5:]
+        style = rng.integers(0, 3, rows)
+        return "-" + micro.where(style == 0, dotted.where(style == 1, grouped))
+
+    expected = {}
+    quote = pick(["", '"', " "])
+    df = pd.DataFrame(
+        {
+            "Grupo": quote + rng.integers(1, 13, rows).astype(str).astype(object),
+            "Latitude": coordinate("Latitude", -22.41),
+            "Longitude": coordinate("Longitude", -45.45),
+            "Temperatura_Coleta": decimal(5, 40, 1) + pick(["ºC", " °C", "ÂºC", ""]),
+            "Temperatura_Analise": decimal(20, 30, 2) + pick(["ºC", "ºc", " C"]),
+            "Ph(Arduino)": decimal(3, 9, 2),
+            "Ph(Fita)": pick(["5", "6", "7", "6,5"]),
+            "Turbidez(NTU)": decimal(0, 400, 2),
+            "Umidade(%)": decimal(40, 90, 2),
+        }
+    )
+    # As coordenadas agrupadas (-45.452.470) o legado lia errado; o valor
+    # certo vem da geração.
+    return df, pd.DataFrame(expected)
+
+
+def measure(fn, df):
+    start = time.perf_counter()
+    fn(df)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn(df)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark da limpeza vetorizada contra as cadeias de str.replace"
+    )
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    args = parser.parse_args()
+
+    df, expected = synthetic_sheet(args.rows)
+    print(f"Planilha sintética: {args.rows} linhas x {len(df.columns)} colunas")
+
+    legacy = legacy_clean(df.head(100_000))
+    vectorized = clean(df.head(100_000), COLUMNS)
+    for column, kind in COLUMNS.items():
+        reference = (expected if kind == "coordinate" else legacy)[column]
+        assert np.allclose(reference.head(100_000), vectorized[column]), column
+
+    legacy_s, legacy_mb = measure(legacy_clean, df)
+    engine_s, engine_mb = measure(lambda df: clean(df, COLUMNS), df)
+    print(f"  str.replace : {legacy_s:7.2f}s  pico {legacy_mb:8.1f}MB")
+    print(f"  vetorizado  : {engine_s:7.2f}s  pico {engine_mb:8.1f}MB")
+    print(
+        f"  ganho       : {legacy_s / engine_s:.1f}x tempo, "
+        f"{legacy_mb / engine_mb:.1f}x memória"
+    )
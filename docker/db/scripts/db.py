@@ -0,0 +1,68 @@
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, event, inspect, text
+
+BASE_DIR = Path(__file__).resolve().parent
+ENV_PATH = (BASE_DIR / ".." / ".." / ".." / ".env").resolve()
+SCHEMA_PATH = BASE_DIR / ".." / "data" / "initdb" / "initdb.sql"
+load_dotenv(ENV_PATH)
+
+# Colunas criadas depois do initdb.sql original, acrescentadas a bancos antigos.
+ADDED_COLUMNS = {"localizacao": {"geohash": "VARCHAR(12)"}}
+
+
+def database_url():
+    # DATABASE_URL (ex.: sqlite:///pi.db) tem prioridade sobre o MySQL do .env.
+    return os.getenv("DATABASE_URL") or (
+        f"mysql+pymysql://{os.getenv('MYSQL_USER')}:{os.getenv('MYSQL_PASSWORD')}@{os.getenv('MYSQL_HOST')}/{os.getenv('MYSQL_DATABASE')}"
+    )
+
+
+def create_db_engine(url=None, local_infile=False):
+    url = url or database_url()
+    connect_args = {}
+    if local_infile and url.startswith("mysql"):
+        connect_args["local_infile"] = True
+    engine = create_engine(url, connect_args=connect_args)
+    if engine.dialect.name == "sqlite":
+        # O pysqlite abre e fecha transações por conta própria, o que quebra os
+        # SAVEPOINTs; o BEGIN passa a ser emitido pelo SQLAlchemy.
+        @event.listens_for(engine, "connect")
+        def _connect(dbapi_connection, _):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(engine, "begin")
+        def _begin(conn):
+            conn.exec_driver_sql("BEGIN")
+
+    return engine
+
+
+def schema_statements(dialect, if_not_exists=False):
+    sql = SCHEMA_PATH.read_text(encoding="utf-8")
+    if if_not_exists:
+        sql = sql.replace("CREATE TABLE ", "CREATE TABLE IF NOT EXISTS ")
+    if dialect == "sqlite":
+        sql = sql.replace(
+            "INT AUTO_INCREMENT PRIMARY KEY", "INTEGER PRIMARY KEY AUTOINCREMENT"
+        )
+    return [statement.strip() for statement in sql.split(";") if statement.strip()]
+
+
+def create_schema(engine, if_not_exists=False):
+    # No MySQL o initdb.sql roda pelo docker-entrypoint; if_not_exists cria só as
+    # tabelas novas (ex.: o livro de ingestão) num banco que já existia.
+    with engine.begin() as conn:
+        for statement in schema_statements(engine.dialect.name, if_not_exists):
+            conn.execute(text(statement))
+        if if_not_exists:
+            inspector = inspect(conn)
+            for table, columns in ADDED_COLUMNS.items():
+                existing = {column["name"] for column in inspector.get_columns(table)}
+                for name, kind in columns.items():
+                    if name not in existing:
+                        conn.execute(
+                            text(f"ALTER TABLE {table} ADD COLUMN {name} {kind}")
+                        )
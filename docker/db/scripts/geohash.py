@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+BASE32 = np.array(list("0123456789bcdefghjkmnpqrstuvwxyz"))
+MAX_PRECISION = 12
+
+
+def encode(latitude, longitude, precision=MAX_PRECISION):
+    # Vetorizado: cada coordenada vira um inteiro com metade dos bits e os bits
+    # são intercalados (longitude primeiro) em grupos de 5 para o base32.
+    lat = np.asarray(latitude, dtype=np.float64)
+    lon = np.asarray(longitude, dtype=np.float64)
+    bits = 5 * precision
+    lon_bits, lat_bits = (bits + 1) // 2, bits // 2
+    # Fora da faixa (ex.: graus-minutos-segundos lidos como decimal) não tem célula.
+    valid = (np.abs(lat) <= 90) & (np.abs(lon) <= 180)
+    lat_cell = np.clip(
+        np.floor((np.nan_to_num(lat) + 90) / 180 * 2.0**lat_bits), 0, 2**lat_bits - 1
+    ).astype(np.int64)
+    lon_cell = np.clip(
+        np.floor((np.nan_to_num(lon) + 180) / 360 * 2.0**lon_bits),
+        0,
+        2**lon_bits - 1,
+    ).astype(np.int64)
+
+    code = np.zeros(len(lat), dtype=np.int64)
+    for bit in range(bits):
+        if bit % 2 == 0:
+            value = (lon_cell >> (lon_bits - 1 - bit // 2)) & 1
+        else:
+            value = (lat_cell >> (lat_bits - 1 - bit // 2)) & 1
+        code = (code << 1) | value
+
+    shifts = 5 * np.arange(precision - 1, -1, -1)
+    chars = np.ascontiguousarray(BASE32[(code[:, None] >> shifts) & 31])
+    hashes = chars.view(f"<U{precision}")[:, 0].astype(object)
+    hashes[~valid] = None
+    return hashes
+
+
+def snap(geohashes, precision):
+    """Reduz geohashes completos à célula da precisão pedida."""
+    return pd.Series(geohashes, dtype=object).str[:precision]
@@ -1,173 +1,474 @@
-import pandas as pd
-from sqlalchemy import create_engine
-from dotenv import load_dotenv
+import argparse
+import csv
+import io
+import json
 import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import groupby, islice
 from pathlib import Path
 
-BASE_DIR = Path(__file__).resolve().parent
-ENV_PATH = (BASE_DIR / ".." / ".." / ".." / ".env").resolve()
-load_dotenv(ENV_PATH)
-
-engine = create_engine(
-    f"mysql+pymysql://{os.getenv('MYSQL_USER')}:{os.getenv('MYSQL_PASSWORD')}@{os.getenv('MYSQL_HOST')}/{os.getenv('MYSQL_DATABASE')}"
-)
-
-df_coleta = pd.read_csv(
-    "../planilhas/BcTec 2025_Coleta_Agua - Página1.csv",
-    encoding="utf-8",
-    sep=None,
-    engine="python",
-)
-
-df_coleta["Ph(Arduino)"] = (
-    df_coleta["Ph(Arduino)"]
-    .astype(str)
-    .str.replace(",", ".", regex=False)
-    .str.strip()
-    .astype(float)
-)
-df_coleta["Ph(Fita)"] = (
-    df_coleta["Ph(Fita)"]
-    .astype(str)
-    .str.replace(",", ".", regex=False)
-    .str.strip()
-    .astype(float)
-)
-
-df_coleta["Umidade(%)"] = (
-    df_coleta["Umidade(%)"]
-    .astype(str)
-    .str.replace(",", ".", regex=False)
-    .str.strip()
-    .astype(float)
-)
-df_coleta["Turbidez(NTU)"] = (
-    df_coleta["Turbidez(NTU)"]
-    .astype(str)
-    .str.replace(",", ".", regex=False)
-    .str.strip()
-    .astype(float)
-)
-
-cols_temp = ["Temperatura_Coleta", "Temperatura_Analise"]
-for col in cols_temp:
-    df_coleta[col] = (
-        df_coleta[col]
-        .astype(str)
-        .str.replace("Â", "", regex=False)
-        .str.replace("º", "", regex=False)
-        .str.replace("°", "", regex=False)
-        .str.replace("C", "", regex=False)
-        .str.replace("c", "", regex=False)
-        .str.replace(" ", "", regex=False)
-        .str.replace(",", ".", regex=False)
-        .astype(float)
+import pandas as pd
+
+from cleaning import COLUMNS, clean
+from db import BASE_DIR, create_db_engine, create_schema
+from ledger import LEDGER, classify
+from loader import STRATEGIES, BulkLoader
+from locations import PRECISION, LocationIndex
+from snapshot import SNAPSHOT_DIR, refresh
+
+CSV_PATH = BASE_DIR / ".." / "planilhas" / "BcTec 2025_Coleta_Agua - Página1.csv"
+CHUNK_SIZE = int(os.getenv("INGEST_CHUNK_SIZE", 50_000))
+STRATEGY = os.getenv("INGEST_STRATEGY", "multirow")
+BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", 1000))
+WORKERS = int(os.getenv("INGEST_WORKERS", os.cpu_count() or 1))
+MODES = ("incremental", "append")
+MODE = os.getenv("INGEST_MODE", "incremental")
+INGEST_COLUMNS = {**COLUMNS, "Numero_Amostra": "integer"}
+# Condutividade medida pelo grupo 4, por Numero_Amostra; vale só para as linhas
+# da planilha original, as outras campanhas não mediram.
+CONDUTIVIDADE_GRUPO4 = {
+    CSV_PATH.name: dict(enumerate([17.4, 79.5, -157, -141, 126, 89, 194], 1))
+}
+
+
+def sniff_delimiter(path, encoding="utf-8", sample_size=64 * 1024):
+    with open(path, encoding=encoding, newline="") as f:
+        sample = f.read(sample_size)
+    return csv.Sniffer().sniff(sample, delimiters=",;\t|").delimiter
+
+
+def read_csv(source, sep, encoding="utf-8", **options):
+    # As colunas limpas chegam como texto para a inferência de tipo por lote não
+    # transformar -22413165 em inteiro antes do motor de limpeza.
+    return pd.read_csv(
+        source,
+        encoding=encoding,
+        sep=sep,
+        engine="c",
+        dtype={column: str for column in INGEST_COLUMNS},
+        **options,
     )
 
-df_coleta["Grupo"] = (
-    df_coleta["Grupo"]
-    .astype(str)
-    .str.replace(",", "", regex=False)
-    .str.replace(" ", "", regex=False)
-    .str.replace('"', "", regex=False)
-    .str.replace("'", "", regex=False)
-    .str.strip()
-    .astype(int)
-)
-
-df_coleta["Latitude"] = df_coleta["Latitude"].astype(str)
-df_coleta["Longitude"] = df_coleta["Longitude"].astype(str)
-
-df_coleta["Latitude"] = (
-    df_coleta["Latitude"]
-    .str.replace("Â", "", regex=False)
-    .str.replace("º", "", regex=False)
-    .str.replace("°", "", regex=False)
-    .str.replace("'", "", regex=False)
-    .str.replace(",", ".", regex=False)
-)
-
-df_coleta["Longitude"] = (
-    df_coleta["Longitude"]
-    .str.replace("Â", "", regex=False)
-    .str.replace("º", "", regex=False)
-    .str.replace("°", "", regex=False)
-    .str.replace("'", "", regex=False)
-    .str.replace(",", ".", regex=False)
-)
-
-df_coleta.loc[df_coleta["Longitude"].str.match(r"^-?\d{7,9}$"), "Longitude"] = (
-    df_coleta["Longitude"].str.replace(r"(-?\d{2})(\d+)", r"\1.\2", regex=True)
-)
-
-df_coleta.loc[df_coleta["Latitude"].str.match(r"^-?\d{7,9}$"), "Latitude"] = df_coleta[
-    "Latitude"
-].str.replace(r"(-?\d{2})(\d+)", r"\1.\2", regex=True)
-
-df_coleta["Latitude"] = df_coleta["Latitude"].str.replace("..", ".", regex=False)
-df_coleta["Longitude"] = df_coleta["Longitude"].str.replace("..", ".", regex=False)
-
-df_coleta["Latitude"] = df_coleta["Latitude"].str.replace(r"\.(?=.*\.)", "", regex=True)
-df_coleta["Longitude"] = df_coleta["Longitude"].str.replace(
-    r"\.(?=.*\.)", "", regex=True
-)
-
-df_coleta["Latitude"] = df_coleta["Latitude"].astype(float)
-df_coleta["Longitude"] = df_coleta["Longitude"].astype(float)
-
-df_local = df_coleta.rename(
-    columns={
-        "Local": "nome",
-        "Latitude": "latitude",
-        "Longitude": "longitude",
-        "Descricao_Local": "descricao",
-    }
-)[["nome", "latitude", "longitude", "descricao"]]
 
-df_local.to_sql("localizacao", engine, if_exists="append", index=False)
+def read_chunks(path, chunk_size=CHUNK_SIZE, encoding="utf-8"):
+    # O separador é detectado uma vez; o resto do arquivo vai para o parser em C.
+    return read_csv(
+        path, sniff_delimiter(path, encoding), encoding, chunksize=chunk_size
+    )
+
+
+def byte_ranges(path, chunk_size=CHUNK_SIZE, sample_size=64 * 1024):
+    # Corta o arquivo em faixas de ~chunk_size linhas, sempre num início de
+    # linha, estimando os bytes por linha por uma amostra. Não lê os dados:
+    # só um readline por corte. Supõe que nenhum campo entre aspas tem quebra
+    # de linha, como nas planilhas exportadas.
+    with open(path, "rb") as f:
+        header = f.readline()
+        sample = f.read(sample_size)
+        step = max(len(sample) // max(sample.count(b"\n"), 1), 1) * chunk_size
+        size = os.fstat(f.fileno()).st_size
+        ranges, start = [], len(header)
+        while start < size:
+            f.seek(start + step)
+            f.readline()
+            end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return header, ranges
+
+
+def local_frame(df):
+    return df.rename(
+        columns={
+            "Local": "nome",
+            "Latitude": "latitude",
+            "Longitude": "longitude",
+            "Descricao_Local": "descricao",
+        }
+    )[["nome", "latitude", "longitude", "descricao"]]
+
+
+def quality_frame(df, amostra_ids):
+    return pd.DataFrame(
+        {
+            "amostra_id": amostra_ids,
+            "temperatura_coleta": df["Temperatura_Coleta"],
+            "temperatura_analise": df["Temperatura_Analise"],
+            "turbidez": df["Turbidez(NTU)"],
+            "ph_fita": df["Ph(Fita)"],
+            "ph_arduino": df["Ph(Arduino)"],
+            "umidade": df["Umidade(%)"],
+        }
+    )
+
+
+def insert_rows(df_coleta, loader, grupos_existentes, locations, origem=None):
+    df_coleta = df_coleta.reset_index(drop=True)
+    df_coleta["localizacao_id"] = locations.resolve(local_frame(df_coleta))
+
+    df_grupos = df_coleta[["Grupo"]].drop_duplicates().rename(columns={"Grupo": "id"})
+    df_grupos = df_grupos[~df_grupos["id"].isin(grupos_existentes)]
+    df_grupos["nome"] = "Grupo " + df_grupos["id"].astype(str)
+    loader.insert("grupos", df_grupos)
+    grupos_existentes.update(df_grupos["id"])
+
+    df_amostras = pd.DataFrame(
+        {"grupo_id": df_coleta["Grupo"], "localizacao_id": df_coleta["localizacao_id"]}
+    )
+    if "data_inclusao" in df_coleta:
+        df_amostras["data_inclusao"] = df_coleta["data_inclusao"]
+
+    amostra_ids = loader.insert("amostras", df_amostras, return_ids=True)
+
+    loader.insert("qualidade_agua", quality_frame(df_coleta, amostra_ids))
+
+    condutividade = CONDUTIVIDADE_GRUPO4.get(origem)
+    if condutividade is not None:
+        grupo4 = (df_coleta["Grupo"] == 4).to_numpy()
+        df_cond = pd.DataFrame(
+            {
+                "amostra_id": amostra_ids[grupo4],
+                "condutividade": df_coleta.loc[grupo4, "Numero_Amostra"]
+                .map(condutividade)
+                .to_numpy(),
+            }
+        ).dropna()
+        loader.insert("condutividade", df_cond)
+
+    return amostra_ids
 
-localizacoes = (
-    pd.read_sql("SELECT * FROM localizacao", engine)
-    .sort_values("id")
-    .reset_index(drop=True)
-)
 
-df_coleta = df_coleta.reset_index(drop=True)
-df_coleta["localizacao_id"] = localizacoes["id"]
+def update_rows(df, loader, locations):
+    # Correções: a amostra mantém o ID e recebe local e leituras novos. A
+    # localização é compartilhada entre amostras, então a coordenada corrigida
+    # é resolvida de novo em vez de alterar a linha existente.
+    loader.update(
+        "amostras",
+        pd.DataFrame(
+            {
+                "localizacao_id": locations.resolve(local_frame(df)),
+                "id": df["amostra_id"],
+            }
+        ),
+        "id",
+    )
+    loader.update("qualidade_agua", quality_frame(df, df["amostra_id"]), "amostra_id")
+    loader.update(
+        LEDGER,
+        pd.DataFrame(
+            {
+                "impressao": df["impressao"],
+                "atualizado_em": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "amostra_id": df["amostra_id"],
+            }
+        ),
+        "amostra_id",
+    )
+
+
+class Writer:
+    """Grava lotes já limpos na transação de conn, na ordem em que chegam."""
+
+    def __init__(self, conn, strategy, batch_size, mode=MODE, precision=PRECISION):
+        if mode not in MODES:
+            raise ValueError(f"Modo inválido: {mode} (opções: {MODES})")
+        self.loader = BulkLoader(conn, strategy, batch_size)
+        self.mode = mode
+        self.grupos = set(pd.read_sql("SELECT id FROM grupos", conn)["id"])
+        self.locations = LocationIndex(self.loader, precision)
+        self.counts = {"inseridas": 0, "atualizadas": 0, "ignoradas": 0}
+        # Amostras corrigidas; as novas o snapshot acha pela marca d'água.
+        self.corrected = []
+
+    def write(self, df, origem):
+        if self.mode == "append":
+            insert_rows(df, self.loader, self.grupos, self.locations, origem)
+            self.counts["inseridas"] += len(df)
+            return
+
+        new, changed, skipped = classify(self.loader.conn, df, origem)
+        if not new.empty:
+            amostra_ids = insert_rows(
+                new, self.loader, self.grupos, self.locations, origem
+            )
+            self.loader.insert(
+                LEDGER,
+                pd.DataFrame(
+                    {
+                        "origem": origem,
+                        "grupo_id": new["Grupo"],
+                        "numero_amostra": new["Numero_Amostra"],
+                        "impressao": new["impressao"],
+                        "amostra_id": amostra_ids,
+                    }
+                ),
+            )
+        if not changed.empty:
+            update_rows(changed, self.loader, self.locations)
+            self.corrected.extend(changed["amostra_id"])
+        self.counts["inseridas"] += len(new)
+        self.counts["atualizadas"] += len(changed)
+        self.counts["ignoradas"] += skipped
 
-df_grupos = df_coleta[["Grupo"]].drop_duplicates().rename(columns={"Grupo": "id"})
-df_grupos["nome"] = "Grupo " + df_grupos["id"].astype(str)
-df_grupos.to_sql("grupos", engine, if_exists="append", index=False)
+    def write_file(self, chunks, origem):
+        # SAVEPOINT por arquivo: um arquivo com erro desfaz só as próprias
+        # linhas, e o estado em memória volta junto.
+        state = set(self.grupos), self.locations.checkpoint(), dict(self.counts)
+        corrected = len(self.corrected)
+        rows = 0
+        try:
+            with self.loader.conn.begin_nested():
+                for df in chunks:
+                    self.write(df, origem)
+                    rows += len(df)
+        except Exception:
+            self.grupos, self.counts = state[0], state[2]
+            self.locations.restore(state[1])
+            del self.corrected[corrected:]
+            raise
+        return rows
 
-df_amostras = pd.DataFrame(
-    {"grupo_id": df_coleta["Grupo"], "localizacao_id": df_coleta["localizacao_id"]}
-)
+    def summary(self):
+        return {
+            **self.counts,
+            "modo": self.mode,
+            "estrategia": self.loader.strategy,
+            "localizacoes": self.locations.summary(),
+            "tabelas": self.loader.summary(),
+        }
 
-df_amostras.to_sql("amostras", engine, if_exists="append", index=False)
 
-amostras = pd.read_sql("SELECT * FROM amostras", engine)
+def ingest(
+    path,
+    engine,
+    chunk_size=CHUNK_SIZE,
+    strategy=STRATEGY,
+    batch_size=BATCH_SIZE,
+    mode=MODE,
+    precision=PRECISION,
+    snapshot=SNAPSHOT_DIR,
+):
+    create_schema(engine, if_not_exists=True)
+    rows = 0
+    start = time.perf_counter()
 
-df_q = pd.DataFrame(
-    {
-        "amostra_id": amostras["id"],
-        "temperatura_coleta": df_coleta["Temperatura_Coleta"],
-        "temperatura_analise": df_coleta["Temperatura_Analise"],
-        "turbidez": df_coleta["Turbidez(NTU)"],
-        "ph_fita": df_coleta["Ph(Fita)"],
-        "ph_arduino": df_coleta["Ph(Arduino)"],
-        "umidade": df_coleta["Umidade(%)"],
+    # Uma transação para a carga inteira: ou a planilha entra toda ou nada entra.
+    with engine.begin() as conn:
+        writer = Writer(conn, strategy, batch_size, mode, precision)
+        for index, chunk in enumerate(read_chunks(path, chunk_size), 1):
+            writer.write(clean(chunk, INGEST_COLUMNS), Path(path).name)
+            rows += len(chunk)
+            elapsed = time.perf_counter() - start
+            print(
+                f"Lote {index}: {rows} linhas ({rows / elapsed:.0f} linhas/s), "
+                f"{writer.counts['inseridas']} novas, "
+                f"{writer.counts['atualizadas']} corrigidas, "
+                f"{writer.counts['ignoradas']} já ingeridas"
+            )
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        "linhas": rows,
+        "segundos": round(elapsed, 2),
+        "linhas_por_segundo": round(rows / elapsed, 1) if elapsed else 0.0,
+        **writer.summary(),
     }
-)
+    # Depois do COMMIT: o snapshot só enxerga o que já está no banco.
+    if snapshot is not None:
+        summary["snapshot"] = refresh(engine, writer.corrected, snapshot)
+    print(summary)
+    return summary
+
+
+def parse_range(path, header, start, end, sep, encoding="utf-8"):
+    # Roda nos processos do pool: cada um lê a própria faixa do arquivo, faz o
+    # parse e a limpeza, sem tocar no banco. Só a fatia limpa volta ao processo
+    # principal, como DataFrame (blocos por coluna) já com os tipos finais.
+    started = time.perf_counter()
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    chunk = read_csv(io.BytesIO(header + data), sep, encoding)
+    return clean(chunk, INGEST_COLUMNS), time.perf_counter() - started
+
+
+def submitted(pool, paths, chunk_size):
+    # O processo principal só detecta o separador e corta cada arquivo em
+    # faixas; erro nessa etapa vira um futuro falho do arquivo.
+    for path in paths:
+        start = time.perf_counter()
+        try:
+            sep = sniff_delimiter(path)
+            header, ranges = byte_ranges(path, chunk_size)
+        except Exception as exc:
+            future = Future()
+            future.set_exception(exc)
+            yield path, future, time.perf_counter() - start
+            continue
+        split_s = time.perf_counter() - start
+        for begin, end in ranges:
+            yield path, pool.submit(parse_range, path, header, begin, end, sep), split_s
+            split_s = 0.0
+
 
-df_q.to_sql("qualidade_agua", engine, if_exists="append", index=False)
+def parsed_chunks(paths, workers=WORKERS, chunk_size=CHUNK_SIZE):
+    # Fatias na ordem dos arquivos, com no máximo workers + 1 em limpeza ou
+    # esperando o gravador: a memória não depende do tamanho dos arquivos.
+    with ProcessPoolExecutor(workers) as pool:
+        jobs = submitted(pool, paths, chunk_size)
+        pending = deque(islice(jobs, workers + 1))
+        while pending:
+            job = pending.popleft()
+            pending.extend(islice(jobs, 1))
+            yield job
 
-grupo4_amostras = amostras[amostras["grupo_id"] == 4]
 
-df_cond = pd.DataFrame(
-    {
-        "amostra_id": grupo4_amostras["id"],
-        "condutividade": [17.4, 79.5, -157, -141, 126, 89, 194],
+def file_chunks(jobs, report):
+    # Entrega as fatias limpas de um arquivo ao gravador; o tempo esperando
+    # a limpeza fica fora do tempo de gravação.
+    for _, future, split_s in jobs:
+        start = time.perf_counter()
+        df, parse_s = future.result()
+        report["espera_s"] += time.perf_counter() - start
+        report["leitura_s"] += split_s + parse_s
+        yield df
+
+
+def ingest_directory(
+    directory,
+    engine,
+    pattern="*.csv",
+    workers=WORKERS,
+    chunk_size=CHUNK_SIZE,
+    strategy=STRATEGY,
+    batch_size=BATCH_SIZE,
+    mode=MODE,
+    precision=PRECISION,
+    snapshot=SNAPSHOT_DIR,
+):
+    paths = sorted(Path(directory).glob(pattern))
+    if not paths:
+        raise FileNotFoundError(f"Nenhum arquivo {pattern} em {directory}")
+    create_schema(engine, if_not_exists=True)
+    files = {
+        path: {
+            "arquivo": path.name,
+            "linhas": 0,
+            "leitura_s": 0.0,
+            "espera_s": 0.0,
+            "gravacao_s": 0.0,
+            "erro": None,
+        }
+        for path in paths
     }
-)
+    start = time.perf_counter()
+
+    # Leitura e limpeza em paralelo, fatia por fatia; um único gravador faz as
+    # inserções em massa, arquivo por arquivo, dentro de uma transação.
+    with engine.begin() as conn:
+        writer = Writer(conn, strategy, batch_size, mode, precision)
+        jobs = parsed_chunks(paths, workers, chunk_size)
+        for path, file_jobs in groupby(jobs, key=lambda job: job[0]):
+            report = files[path]
+            write_start = time.perf_counter()
+            try:
+                report["linhas"] = writer.write_file(
+                    file_chunks(file_jobs, report), path.name
+                )
+            except Exception as exc:
+                report["erro"] = f"{type(exc).__name__}: {exc}"
+            report["gravacao_s"] = (
+                time.perf_counter() - write_start - report["espera_s"]
+            )
+            print(
+                f"{path.name}: "
+                + (
+                    f"ERRO {report['erro']}"
+                    if report["erro"]
+                    else f"{report['linhas']} linhas"
+                )
+            )
+
+    files = list(files.values())
+    for report in files:
+        for key in ("leitura_s", "espera_s", "gravacao_s"):
+            report[key] = round(report[key], 3)
+    elapsed = time.perf_counter() - start
+    rows = sum(report["linhas"] for report in files)
+    parse_s = sum(report["leitura_s"] for report in files)
+    write_s = sum(report["gravacao_s"] for report in files)
+    summary = {
+        "arquivos": len(files),
+        "arquivos_com_erro": sum(report["erro"] is not None for report in files),
+        "linhas": rows,
+        "segundos": round(elapsed, 2),
+        "linhas_por_segundo": round(rows / elapsed, 1) if elapsed else 0.0,
+        "processos": workers,
+        "leitura_s": round(parse_s, 2),
+        "gravacao_s": round(write_s, 2),
+        **writer.summary(),
+        "por_arquivo": files,
+    }
+    if snapshot is not None:
+        summary["snapshot"] = refresh(engine, writer.corrected, snapshot)
+    print(
+        f"{summary['arquivos']} arquivos ({summary['arquivos_com_erro']} com erro), "
+        f"{rows} linhas em {elapsed:.2f}s ({summary['linhas_por_segundo']:.0f} "
+        f"linhas/s); leitura {parse_s:.2f}s em {workers} processos, "
+        f"gravação {write_s:.2f}s"
+    )
+    return summary
+
 
-df_cond.to_sql("condutividade", engine, if_exists="append", index=False)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Carrega a planilha de coletas (ou um diretório delas) no banco"
+    )
+    parser.add_argument("csv", nargs="?", default=CSV_PATH, help="arquivo ou diretório")
+    parser.add_argument("--pattern", default="*.csv", help="filtro no modo diretório")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--report", help="salva o relatório do diretório em JSON")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--strategy", default=STRATEGY, choices=STRATEGIES)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument(
+        "--mode",
+        default=MODE,
+        choices=MODES,
+        help="incremental ignora linhas já ingeridas e corrige as alteradas",
+    )
+    parser.add_argument(
+        "--geohash-precision",
+        type=int,
+        default=PRECISION,
+        help="amostras na mesma célula reaproveitam a localização (8 ≈ 38 x 19 m)",
+    )
+    parser.add_argument("--snapshot-dir", default=SNAPSHOT_DIR)
+    parser.add_argument(
+        "--no-snapshot",
+        action="store_true",
+        help="não atualiza o snapshot Parquet do dashboard",
+    )
+    args = parser.parse_args()
+
+    engine = create_db_engine(local_infile=args.strategy == "infile")
+    options = {
+        "chunk_size": args.chunk_size,
+        "strategy": args.strategy,
+        "batch_size": args.batch_size,
+        "mode": args.mode,
+        "precision": args.geohash_precision,
+        "snapshot": None if args.no_snapshot else args.snapshot_dir,
+    }
+    if Path(args.csv).is_dir():
+        summary = ingest_directory(
+            args.csv, engine, args.pattern, args.workers, **options
+        )
+        if args.report:
+            with open(args.report, "w") as f:
+                json.dump(summary, f, indent=2, ensure_ascii=False)
+            print(f"Relatório salvo em {args.report}")
+    else:
+        ingest(args.csv, engine, **options)
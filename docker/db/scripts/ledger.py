@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+LEDGER = "ingestao_linhas"
+KEY = ["Grupo", "Numero_Amostra"]
+CONTENT = [
+    "Local",
+    "Latitude",
+    "Longitude",
+    "Descricao_Local",
+    "Temperatura_Coleta",
+    "Temperatura_Analise",
+    "Ph(Arduino)",
+    "Ph(Fita)",
+    "Turbidez(NTU)",
+    "Umidade(%)",
+]
+
+
+def fingerprint(df, columns=CONTENT):
+    # Hash de 64 bits por linha sobre os valores já limpos: "25ºC" e "25,0ºC"
+    # geram a mesma impressão, e qualquer correção numa leitura muda o hash.
+    hashes = pd.util.hash_pandas_object(df[columns], index=False)
+    return hashes.to_numpy().view(np.int64)
+
+
+def lookup(conn, df, origem):
+    # Só as entradas do livro com as chaves do lote, pelo índice da PK.
+    if df.empty:
+        return pd.DataFrame(columns=KEY + ["impressao", "amostra_id", "localizacao_id"])
+    grupos = ", ".join(str(int(grupo)) for grupo in df["Grupo"].unique())
+    query = text(
+        f"SELECT i.grupo_id AS Grupo, i.numero_amostra AS Numero_Amostra, "
+        f"i.impressao, i.amostra_id, a.localizacao_id "
+        f"FROM {LEDGER} i JOIN amostras a ON a.id = i.amostra_id "
+        f"WHERE i.origem = :origem AND i.grupo_id IN ({grupos}) "
+        f"AND i.numero_amostra BETWEEN :low AND :high"
+    )
+    params = {
+        "origem": origem,
+        "low": int(df["Numero_Amostra"].min()),
+        "high": int(df["Numero_Amostra"].max()),
+    }
+    return pd.read_sql(query, conn, params=params)
+
+
+def classify(conn, df, origem):
+    """Separa o lote limpo em linhas novas, corrigidas e já ingeridas.
+
+    A chave é (origem, grupo, número da amostra): cada planilha de campanha
+    numera as próprias amostras.
+    """
+    # Dentro do mesmo lote vale a última ocorrência de cada chave.
+    df = df.drop_duplicates(KEY, keep="last").reset_index(drop=True)
+    df["impressao"] = fingerprint(df)
+    known = lookup(conn, df, origem)
+    merged = df.merge(
+        known, on=KEY, how="left", suffixes=("", "_livro"), validate="one_to_one"
+    )
+    new = merged["amostra_id"].isna()
+    changed = ~new & (merged["impressao"] != merged["impressao_livro"])
+    columns = list(df.columns)
+    return (
+        merged.loc[new, columns].reset_index(drop=True),
+        merged.loc[changed].drop(columns="impressao_livro").reset_index(drop=True),
+        int((~new & ~changed).sum()),
+    )
@@ -0,0 +1,153 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+
+import numpy as np
+
+# Ao redor do campus, como as coordenadas da planilha.
+CENTER = (-22.4128, -45.4510)
+
+
+def reading(rng, probe, position, invalid):
+    values = {
+        "sensor": f"sonda-{probe:03d}",
+        "grupo": probe % 12 + 1,
+        "latitude": position[0],
+        "longitude": position[1],
+        "temperatura_coleta": round(rng.uniform(15, 35), 1),
+        "ph_arduino": round(rng.uniform(4, 9), 2),
+        "turbidez": round(rng.uniform(0, 200), 2),
+        "umidade": round(rng.uniform(40, 90), 1),
+        "timestamp": time.time(),
+    }
+    if rng.random() < invalid:
+        values["ph_arduino"] = "sem leitura"
+    return values
+
+
+def as_json(readings):
+    return "application/json", json.dumps(readings).encode()
+
+
+def as_line_protocol(readings):
+    lines = []
+    for values in readings:
+        values = dict(values)
+        tags = f"sensor={values.pop('sensor')},grupo={values.pop('grupo')}"
+        stamp = int(values.pop("timestamp") * 1e9)
+        fields = ",".join(
+            f'{key}="{value}"' if isinstance(value, str) else f"{key}={value}"
+            for key, value in values.items()
+        )
+        lines.append(f"agua,{tags} {fields} {stamp}")
+    return "text/plain", "\n".join(lines).encode()
+
+
+async def request(reader, writer, host, method, path, content_type=None, body=b""):
+    head = [f"{method} {path} HTTP/1.1", f"Host: {host}"]
+    if content_type:
+        head += [f"Content-Type: {content_type}", f"Content-Length: {len(body)}"]
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode().partition(":")
+        headers[name.strip().lower()] = value.strip()
+    payload = await reader.readexactly(int(headers.get("content-length", 0)))
+    return status, headers, payload
+
+
+async def probe(index, args, deadline, latencies, statuses):
+    # Cada sonda tem posição fixa e conexão keep-alive própria, e alterna
+    # entre JSON e line protocol.
+    rng = random.Random(index)
+    position = (
+        round(CENTER[0] + rng.uniform(-0.005, 0.005), 6),
+        round(CENTER[1] + rng.uniform(-0.005, 0.005), 6),
+    )
+    encode = as_json if index % 2 == 0 else as_line_protocol
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    await asyncio.sleep(rng.uniform(0, args.interval))
+    try:
+        while time.monotonic() < deadline:
+            readings = [
+                reading(rng, index, position, args.invalid)
+                for _ in range(args.readings)
+            ]
+            content_type, body = encode(readings)
+            start = time.perf_counter()
+            status, headers, _ = await request(
+                reader, writer, args.host, "POST", "/leituras", content_type, body
+            )
+            latencies.append(time.perf_counter() - start)
+            statuses[status] += 1
+            delay = args.interval * rng.uniform(0.8, 1.2)
+            if status == 503:
+                delay = max(delay, float(headers.get("retry-after", 1)))
+            await asyncio.sleep(delay)
+    finally:
+        writer.close()
+
+
+async def server_stats(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        _, _, payload = await request(reader, writer, host, "GET", "/saude")
+        return json.loads(payload)
+    finally:
+        writer.close()
+
+
+async def run(args):
+    latencies, statuses = [], Counter()
+    start = time.monotonic()
+    deadline = start + args.duration
+    await asyncio.gather(
+        *(
+            probe(index, args, deadline, latencies, statuses)
+            for index in range(args.probes)
+        )
+    )
+    elapsed = time.monotonic() - start
+    # Dá tempo ao último flush por intervalo antes de consultar o servidor.
+    await asyncio.sleep(args.settle)
+
+    ms = np.array(latencies) * 1000
+    requests = len(latencies)
+    report = {
+        "sondas": args.probes,
+        "segundos": round(elapsed, 2),
+        "requisicoes": requests,
+        "requisicoes_por_s": round(requests / elapsed, 1),
+        "leituras_por_s": round(statuses[202] * args.readings / elapsed, 1),
+        "status": dict(statuses),
+        "latencia_ms": {
+            "p50": round(float(np.percentile(ms, 50)), 2),
+            "p95": round(float(np.percentile(ms, 95)), 2),
+            "p99": round(float(np.percentile(ms, 99)), 2),
+            "max": round(float(ms.max()), 2),
+        },
+        "servidor": await server_stats(args.host, args.port),
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Simula sondas enviando leituras ao sensors.py"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--probes", type=int, default=300)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--interval", type=float, default=1.0, help="segundos")
+    parser.add_argument("--readings", type=int, default=1, help="por requisição")
+    parser.add_argument("--invalid", type=float, default=0.01, help="fração")
+    parser.add_argument("--settle", type=float, default=2.0)
+    args = parser.parse_args()
+    asyncio.run(run(args))
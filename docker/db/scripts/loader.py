@@ -0,0 +1,276 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from db import create_db_engine
+
+STRATEGIES = ("to_sql", "executemany", "multirow", "infile")
+PLACEHOLDERS = {"qmark": "?", "format": "%s", "pyformat": "%s"}
+SQLITE_MAX_VARIABLES = 32766
+
+
+def records(df):
+    # Objetos Python nativos com None no lugar de NaN, como o DBAPI espera.
+    values = df.astype(object).where(df.notna(), None)
+    return values.to_numpy().tolist()
+
+
+def infile_field(value):
+    # Com ENCLOSED BY e sem ESCAPED BY, o MySQL lê a palavra NULL sem aspas
+    # como NULL ("NULL" entre aspas é o texto). Textos vão sempre entre aspas,
+    # com as aspas internas dobradas.
+    if value is None:
+        return "NULL"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+class BulkLoader:
+    def __init__(self, conn, strategy="multirow", batch_size=1000):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Estratégia inválida: {strategy} (opções: {STRATEGIES})")
+        dialect = conn.dialect.name
+        if strategy == "infile" and dialect != "mysql":
+            raise ValueError("LOAD DATA LOCAL INFILE só existe no MySQL")
+        self.conn = conn
+        self.strategy = strategy
+        self.batch_size = batch_size
+        self.dialect = dialect
+        self.stats = {}
+        self._statements = {}
+        self._id_step = None
+
+    def insert(self, name, df, return_ids=False):
+        # Com return_ids o lote sempre vai pelo INSERT de várias linhas, que é
+        # o único caminho em que o banco informa os IDs gerados por comando.
+        if df.empty:
+            return np.empty(0, dtype=np.int64) if return_ids else 0
+        start = time.perf_counter()
+        ids = [] if return_ids else None
+        if return_ids:
+            self._multirow(name, df, ids)
+        else:
+            getattr(self, f"_{self.strategy}")(name, df)
+        self._track(name, len(df), start)
+        return np.concatenate(ids) if return_ids else len(df)
+
+    def update(self, name, df, key):
+        # UPDATE ... WHERE key = ? via executemany, nos mesmos lotes do insert.
+        if df.empty:
+            return 0
+        start = time.perf_counter()
+        placeholder = PLACEHOLDERS[self.conn.dialect.paramstyle]
+        columns = [column for column in df.columns if column != key]
+        statement = (
+            f"UPDATE {name} SET "
+            + ", ".join(f"{column} = {placeholder}" for column in columns)
+            + f" WHERE {key} = {placeholder}"
+        )
+        for batch in self.batches(df[columns + [key]], len(df.columns)):
+            self.conn.exec_driver_sql(statement, list(map(tuple, records(batch))))
+        self._track(f"{name} (update)", len(df), start)
+        return len(df)
+
+    def _track(self, name, rows, start):
+        stats = self.stats.setdefault(name, {"rows": 0, "seconds": 0.0})
+        stats["rows"] += rows
+        stats["seconds"] += time.perf_counter() - start
+
+    @property
+    def id_step(self):
+        if self._id_step is None:
+            self._id_step = 1
+            if self.dialect == "mysql":
+                self._id_step = self.conn.exec_driver_sql(
+                    "SELECT @@auto_increment_increment"
+                ).scalar()
+        return self._id_step
+
+    def batch_ids(self, lastrowid, n):
+        # Um INSERT de várias linhas recebe IDs consecutivos (no passo de
+        # auto_increment_increment). O MySQL devolve o primeiro deles em
+        # lastrowid; o SQLite devolve o último.
+        if self.dialect == "sqlite":
+            first = lastrowid - (n - 1) * self.id_step
+        else:
+            first = lastrowid
+        return first + self.id_step * np.arange(n, dtype=np.int64)
+
+    def batches(self, df, columns):
+        size = self.batch_size
+        if self.dialect == "sqlite":
+            size = min(size, SQLITE_MAX_VARIABLES // columns)
+        for start in range(0, len(df), size):
+            yield df.iloc[start : start + size]
+
+    def _to_sql(self, name, df):
+        df.to_sql(
+            name, self.conn, if_exists="append", index=False, chunksize=self.batch_size
+        )
+
+    def _executemany(self, name, df):
+        # executemany do DBAPI; o pymysql reescreve em INSERTs de várias linhas.
+        placeholder = PLACEHOLDERS[self.conn.dialect.paramstyle]
+        statement = (
+            f"INSERT INTO {name} ({', '.join(df.columns)}) "
+            f"VALUES ({', '.join([placeholder] * len(df.columns))})"
+        )
+        for batch in self.batches(df, len(df.columns)):
+            self.conn.exec_driver_sql(statement, list(map(tuple, records(batch))))
+
+    def _multirow(self, name, df, ids=None):
+        # INSERT ... VALUES (...), (...) montado uma vez por tamanho de lote e
+        # executado direto no cursor da conexão (mesma transação).
+        cursor = self.conn.connection.cursor()
+        placeholder = PLACEHOLDERS[self.conn.dialect.paramstyle]
+        try:
+            for batch in self.batches(df, len(df.columns)):
+                key = (name, tuple(df.columns), len(batch))
+                if key not in self._statements:
+                    row = "(" + ", ".join([placeholder] * len(df.columns)) + ")"
+                    self._statements[key] = (
+                        f"INSERT INTO {name} ({', '.join(df.columns)}) VALUES "
+                        + ", ".join([row] * len(batch))
+                    )
+                params = [value for row in records(batch) for value in row]
+                cursor.execute(self._statements[key], params)
+                if ids is not None:
+                    ids.append(self.batch_ids(cursor.lastrowid, len(batch)))
+        finally:
+            cursor.close()
+
+    def _infile(self, name, df):
+        with tempfile.NamedTemporaryFile(
+            "w", suffix=".csv", newline="", encoding="utf-8", delete=False
+        ) as f:
+            for row in records(df):
+                f.write(",".join(map(infile_field, row)) + "\n")
+            path = f.name
+        try:
+            self.conn.execute(
+                text(
+                    f"LOAD DATA LOCAL INFILE '{path}' INTO TABLE {name} "
+                    "CHARACTER SET utf8mb4 FIELDS TERMINATED BY ',' "
+                    "OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' "
+                    f"LINES TERMINATED BY '\\n' ({', '.join(df.columns)})"
+                )
+            )
+        finally:
+            os.remove(path)
+
+    def summary(self):
+        return {
+            name: {
+                **stats,
+                "rows_per_sec": (
+                    round(stats["rows"] / stats["seconds"], 1)
+                    if stats["seconds"]
+                    else 0.0
+                ),
+            }
+            for name, stats in self.stats.items()
+        }
+
+
+BENCH_TABLE = "bench_bulk_load"
+BENCH_COLUMNS = {
+    "amostra_id": "INT NOT NULL",
+    "temperatura_coleta": "DECIMAL(5,2)",
+    "temperatura_analise": "DECIMAL(5,2)",
+    "turbidez": "DECIMAL(10,2)",
+    "ph_fita": "DECIMAL(4,2)",
+    "ph_arduino": "DECIMAL(4,2)",
+    "umidade": "DECIMAL(5,2)",
+    "local": "VARCHAR(255)",
+}
+
+
+def synthetic_rows(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "amostra_id": np.arange(1, rows + 1),
+            "temperatura_coleta": rng.uniform(5, 40, rows).round(2),
+            "temperatura_analise": rng.uniform(20, 30, rows).round(2),
+            "turbidez": rng.uniform(0, 400, rows).round(2),
+            "ph_fita": rng.integers(4, 9, rows).astype(float),
+            "ph_arduino": rng.uniform(3, 9, rows).round(2),
+            "umidade": rng.uniform(40, 90, rows).round(2),
+            "local": rng.choice(['PREDIO "L9"', "LAGO, FUNDOS", "NULL", "\\N"], rows),
+        }
+    )
+    df.loc[rng.random(rows) < 0.05, "ph_arduino"] = np.nan
+    df.loc[rng.random(rows) < 0.05, "local"] = None
+    return df
+
+
+def check_loaded(conn, df):
+    # Compara os valores gravados, NULLs inclusive, e não só a contagem.
+    stored = pd.read_sql(text(f"SELECT * FROM {BENCH_TABLE} ORDER BY amostra_id"), conn)
+    pd.testing.assert_frame_equal(
+        stored[list(df.columns)], df, check_dtype=False, check_exact=False
+    )
+
+
+def benchmark(engine, strategies, batch_sizes, rows):
+    # Tabela descartável sem FKs: o benchmark nunca toca nas tabelas reais.
+    df = synthetic_rows(rows)
+    columns = ", ".join(f"{name} {kind}" for name, kind in BENCH_COLUMNS.items())
+    results = []
+    for strategy in strategies:
+        for batch_size in batch_sizes if strategy != "infile" else batch_sizes[:1]:
+            with engine.begin() as conn:
+                conn.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+                conn.execute(text(f"CREATE TABLE {BENCH_TABLE} ({columns})"))
+            start = time.perf_counter()
+            with engine.begin() as conn:
+                BulkLoader(conn, strategy, batch_size).insert(BENCH_TABLE, df)
+            elapsed = time.perf_counter() - start
+            with engine.connect() as conn:
+                check_loaded(conn, df)
+            results.append(
+                {
+                    "strategy": strategy,
+                    "batch_size": batch_size,
+                    "rows": rows,
+                    "seconds": round(elapsed, 3),
+                    "rows_per_sec": round(rows / elapsed, 1),
+                }
+            )
+            print(
+                f"{strategy:12s} lote={batch_size:<6d} {elapsed:7.2f}s "
+                f"{rows / elapsed:10.0f} linhas/s"
+            )
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark das estratégias de carga em massa"
+    )
+    parser.add_argument("--url", help="padrão: DATABASE_URL ou o MySQL do .env")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument(
+        "--strategies",
+        nargs="+",
+        default=["to_sql", "executemany", "multirow"],
+        choices=STRATEGIES,
+    )
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[500, 5000])
+    parser.add_argument("--out", default="bulk_benchmark.json")
+    args = parser.parse_args()
+
+    engine = create_db_engine(args.url, local_infile="infile" in args.strategies)
+    results = benchmark(engine, args.strategies, args.batch_sizes, args.rows)
+    with open(args.out, "w") as f:
+        json.dump({"dialect": engine.dialect.name, "results": results}, f, indent=2)
+    print(f"Relatório salvo em {args.out}")
@@ -0,0 +1,92 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from geohash import MAX_PRECISION, encode, snap
+
+PRECISION = int(os.getenv("INGEST_GEOHASH_PRECISION", 8))
+
+
+class LocationIndex:
+    """Índice em memória de célula geohash para localizacao.id.
+
+    Amostras que caem na mesma célula (a mesma torneira, o mesmo prédio)
+    reaproveitam uma única localização em vez de gravar uma linha cada.
+    """
+
+    def __init__(self, loader, precision=PRECISION):
+        if not 1 <= precision <= MAX_PRECISION:
+            raise ValueError(
+                f"Precisão do geohash deve estar entre 1 e {MAX_PRECISION}"
+            )
+        self.loader = loader
+        self.precision = precision
+        self.created = 0
+        self.reused = 0
+        self._backfill()
+        existing = pd.read_sql(
+            "SELECT id, geohash FROM localizacao WHERE geohash IS NOT NULL ORDER BY id",
+            loader.conn,
+        )
+        cells = snap(existing["geohash"], precision)
+        first = ~cells.duplicated()
+        self.ids = dict(zip(cells[first], existing.loc[first, "id"]))
+
+    def _backfill(self):
+        # Localizações gravadas antes do geohash recebem o código uma única vez.
+        # Coordenadas fora da faixa continuam sem célula (como no encode) e
+        # ficam de fora, senão voltariam a ser atualizadas a cada carga.
+        old = pd.read_sql(
+            "SELECT id, latitude, longitude FROM localizacao "
+            "WHERE geohash IS NULL AND ABS(latitude) <= 90 AND ABS(longitude) <= 180",
+            self.loader.conn,
+        )
+        if not old.empty:
+            old["geohash"] = encode(old["latitude"], old["longitude"])
+            self.loader.update("localizacao", old[["geohash", "id"]], "id")
+
+    def resolve(self, df_local):
+        df_local = df_local.reset_index(drop=True)
+        geohashes = encode(df_local["latitude"], df_local["longitude"])
+        cells = snap(geohashes, self.precision)
+        ids = cells.map(self.ids)
+
+        # Uma localização nova por célula desconhecida; a primeira amostra da
+        # célula dá o nome, a descrição e as coordenadas.
+        unknown = ids.isna() & cells.notna()
+        first = unknown & ~cells.where(unknown).duplicated()
+        if first.any():
+            new_ids = self.loader.insert(
+                "localizacao",
+                df_local[first].assign(geohash=geohashes[first]),
+                return_ids=True,
+            )
+            self.ids.update(zip(cells[first], new_ids))
+            self.created += len(new_ids)
+            ids = cells.map(self.ids)
+
+        # Sem coordenadas não há célula: cada amostra fica com a sua.
+        orphan = cells.isna()
+        if orphan.any():
+            ids[orphan] = self.loader.insert(
+                "localizacao", df_local[orphan].assign(geohash=None), return_ids=True
+            )
+            self.created += int(orphan.sum())
+
+        self.reused += len(df_local) - int(first.sum()) - int(orphan.sum())
+        return ids.to_numpy(dtype=np.int64)
+
+    def checkpoint(self):
+        return dict(self.ids), self.created, self.reused
+
+    def restore(self, state):
+        # Depois de um ROLLBACK TO SAVEPOINT os IDs criados deixam de existir.
+        self.ids, self.created, self.reused = state
+
+    def summary(self):
+        return {
+            "precisao": self.precision,
+            "novas": self.created,
+            "reaproveitadas": self.reused,
+        }
@@ -0,0 +1,659 @@
+import argparse
+import asyncio
+import json
+import os
+import re
+import signal
+import time
+from collections import deque
+from http import HTTPStatus
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.exc import DisconnectionError, InterfaceError, OperationalError
+
+from cleaning import COLUMNS, to_float
+from db import create_db_engine, create_schema
+from init import insert_rows
+from loader import STRATEGIES, BulkLoader
+from locations import PRECISION, LocationIndex
+from snapshot import SNAPSHOT_DIR, refresh
+
+HOST = os.getenv("SENSOR_HOST", "0.0.0.0")
+PORT = int(os.getenv("SENSOR_PORT", 8090))
+FLUSH_ROWS = int(os.getenv("SENSOR_FLUSH_ROWS", 500))
+FLUSH_INTERVAL = float(os.getenv("SENSOR_FLUSH_INTERVAL", 1.0))
+MAX_BUFFERED = int(os.getenv("SENSOR_MAX_BUFFERED", 20_000))
+BACKPRESSURE_TIMEOUT = float(os.getenv("SENSOR_BACKPRESSURE_TIMEOUT", 5.0))
+MAX_RETRIES = int(os.getenv("SENSOR_MAX_RETRIES", 8))
+DEAD_LETTER = os.getenv("SENSOR_DEAD_LETTER", "sensors_rejeitadas.jsonl")
+SNAPSHOT_INTERVAL = float(os.getenv("SENSOR_SNAPSHOT_INTERVAL", 60.0))
+MAX_PENDING = 1024
+IDLE_TIMEOUT = 60.0
+MAX_BODY = 1 << 20
+
+# Campo da leitura -> coluna da planilha: as leituras passam pelo mesmo motor
+# de limpeza do init.py ("25,3ºC", "4,98" e 25.3 são aceitos do mesmo jeito).
+FIELDS = {
+    "grupo": "Grupo",
+    "latitude": "Latitude",
+    "longitude": "Longitude",
+    "local": "Local",
+    "descricao": "Descricao_Local",
+    "temperatura_coleta": "Temperatura_Coleta",
+    "temperatura_analise": "Temperatura_Analise",
+    "ph_arduino": "Ph(Arduino)",
+    "ph_fita": "Ph(Fita)",
+    "turbidez": "Turbidez(NTU)",
+    "umidade": "Umidade(%)",
+}
+METADATA = {"sensor", "timestamp"}
+READINGS = [
+    "Temperatura_Coleta",
+    "Temperatura_Analise",
+    "Ph(Arduino)",
+    "Ph(Fita)",
+    "Turbidez(NTU)",
+    "Umidade(%)",
+]
+# (precisão, escala) das colunas DECIMAL do initdb.sql: fora da faixa o MySQL
+# em modo estrito recusa a transação do flush inteiro.
+DECIMALS = {
+    "Temperatura_Coleta": (5, 2),
+    "Temperatura_Analise": (5, 2),
+    "Ph(Arduino)": (4, 2),
+    "Ph(Fita)": (4, 2),
+    "Turbidez(NTU)": (10, 2),
+    "Umidade(%)": (5, 2),
+}
+MAX_INT = 2**31 - 1
+MAX_VARCHAR = 255
+# Banco fora do ar ou conexão perdida: vale esperar e tentar o lote de novo.
+TRANSIENT = (
+    OperationalError,
+    InterfaceError,
+    DisconnectionError,
+    ConnectionError,
+    TimeoutError,
+)
+
+
+class Backpressure(Exception):
+    pass
+
+
+def split_escaped(text, separator):
+    # Separa fora de aspas; uma barra invertida escapa o separador da vez.
+    parts, current, quoted, escaped = [], [], False, False
+    for char in text:
+        if escaped:
+            current.append(char if char == separator else "\\" + char)
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char == '"':
+            quoted = not quoted
+            current.append(char)
+        elif char == separator and not quoted:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append("".join(current))
+    return parts
+
+
+def parse_line_protocol(body):
+    # agua,grupo=7,sensor=sonda-01 ph_arduino=4.98,turbidez=0 1718000000000000000
+    # Tags e campos viram a mesma leitura; o timestamp opcional é em ns.
+    readings = []
+    for number, line in enumerate(body.splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        parts = split_escaped(line, " ")
+        if len(parts) not in (2, 3):
+            raise ValueError(f"linha {number}: esperado 'medida,tags campos [ns]'")
+        reading = {}
+        for pair in split_escaped(parts[0], ",")[1:] + split_escaped(parts[1], ","):
+            key, sep, value = pair.partition("=")
+            if not sep:
+                raise ValueError(f"linha {number}: par inválido {pair!r}")
+            value = value.strip('"')
+            reading[key] = value[:-1] if re.fullmatch(r"-?\d+i", value) else value
+        if len(parts) == 3:
+            if not parts[2].isdigit():
+                raise ValueError(f"linha {number}: timestamp deve ser em ns")
+            reading["timestamp"] = int(parts[2]) / 1e9
+        readings.append(reading)
+    return readings
+
+
+def timestamp(value, received_at):
+    if value is None:
+        stamp = received_at
+    elif isinstance(value, (int, float)):
+        stamp = pd.Timestamp(value, unit="s", tz="UTC")
+    else:
+        stamp = pd.Timestamp(value)
+        stamp = stamp.tz_localize("UTC") if stamp.tz is None else stamp
+    return stamp.tz_convert("UTC").strftime("%Y-%m-%d %H:%M:%S")
+
+
+def check_structure(readings):
+    # Só a forma do corpo; os valores são validados em lote por normalize().
+    if isinstance(readings, dict):
+        readings = [readings]
+    if not isinstance(readings, list) or not readings:
+        raise ValueError("esperado um objeto ou uma lista de leituras")
+    if not all(isinstance(reading, dict) for reading in readings):
+        raise ValueError("cada leitura deve ser um objeto")
+    unknown = set().union(*readings) - set(FIELDS) - METADATA
+    if unknown:
+        raise ValueError(f"campos desconhecidos: {sorted(unknown)}")
+    return readings
+
+
+def normalize(readings, received_at=None):
+    """Limpa leituras com as regras do init.py e aponta o erro de cada uma.
+
+    Devolve o lote no formato das linhas da planilha e uma lista com None
+    para as leituras válidas ou a mensagem de erro das demais.
+    """
+    raw = pd.DataFrame(
+        [
+            {
+                FIELDS[key]: None if value is None else str(value)
+                for key, value in reading.items()
+                if key in FIELDS
+            }
+            for reading in readings
+        ],
+        columns=list(FIELDS.values()),
+        dtype=object,
+    )
+    raw["Local"] = raw["Local"].fillna(
+        pd.Series([reading.get("sensor") for reading in readings], dtype=object)
+    )
+    df = raw.copy(deep=False)
+    for column, kind in COLUMNS.items():
+        df[column] = to_float(raw[column], kind)
+
+    errors = [None] * len(df)
+
+    def flag(mask, message):
+        for row in np.flatnonzero(mask):
+            if errors[row] is None:
+                errors[row] = message(row)
+
+    flag(
+        df["Grupo"].isna() | ~df["Grupo"].between(1, MAX_INT),
+        lambda row: f"grupo inválido: {raw['Grupo'][row]!r}",
+    )
+    # O que veio preenchido e não passou na limpeza é erro de quem enviou,
+    # não um valor ausente.
+    for column in COLUMNS:
+        flag(
+            raw[column].notna() & df[column].isna(),
+            lambda row: f"valor inválido em {column}: {raw[column][row]!r}",
+        )
+    flag(
+        ~((df["Latitude"].abs() <= 90) & (df["Longitude"].abs() <= 180)),
+        lambda row: "latitude e longitude válidas são obrigatórias",
+    )
+    for column, (precision, scale) in DECIMALS.items():
+        limit = 10 ** (precision - scale) - 10**-scale
+        flag(
+            df[column].round(scale).abs() > limit,
+            lambda row: f"{column} fora da faixa (±{limit:.{scale}f}): {raw[column][row]!r}",
+        )
+    flag(
+        raw["Local"].str.len() > MAX_VARCHAR,
+        lambda row: f"local com mais de {MAX_VARCHAR} caracteres",
+    )
+    flag(df[READINGS].isna().all(axis=1), lambda row: "leitura sem nenhuma medida")
+
+    received_at = received_at or pd.Timestamp.now(tz="UTC")
+    stamps = []
+    for row, reading in enumerate(readings):
+        try:
+            stamps.append(timestamp(reading.get("timestamp"), received_at))
+        except (ValueError, TypeError):
+            stamps.append(None)
+            errors[row] = errors[row] or (
+                f"timestamp inválido: {reading['timestamp']!r}"
+            )
+    df["data_inclusao"] = stamps
+    df["Grupo"] = df["Grupo"].fillna(0).astype(np.int64)
+    # Leituras de sonda não têm número de amostra (nem condutividade).
+    df["Numero_Amostra"] = np.nan
+    return df, errors
+
+
+class Buffer:
+    """Leituras aceitas aguardando o flush, com capacidade limitada.
+
+    A capacidade conta também o lote que está sendo gravado: com o banco
+    lento, os produtores esperam espaço e depois recebem 503.
+    """
+
+    def __init__(self, capacity=MAX_BUFFERED, timeout=BACKPRESSURE_TIMEOUT):
+        self.capacity = capacity
+        self.timeout = timeout
+        self.frames = deque()
+        self.rows = 0
+        self.in_flight = 0
+        self.changed = asyncio.Condition()
+
+    def has_room(self, rows):
+        return self.rows + self.in_flight + rows <= self.capacity or (
+            self.rows + self.in_flight == 0
+        )
+
+    async def put(self, df):
+        async with self.changed:
+            try:
+                await asyncio.wait_for(
+                    self.changed.wait_for(lambda: self.has_room(len(df))), self.timeout
+                )
+            except TimeoutError:
+                raise Backpressure from None
+            self.frames.append(df)
+            self.rows += len(df)
+            self.changed.notify_all()
+
+    async def take(self, min_rows, timeout):
+        # Espera min_rows ou o intervalo, o que vier primeiro.
+        async with self.changed:
+            try:
+                await asyncio.wait_for(
+                    self.changed.wait_for(lambda: self.rows >= min_rows), timeout
+                )
+            except TimeoutError:
+                pass
+            if not self.frames:
+                return None
+            batch = pd.concat(self.frames, ignore_index=True)
+            self.frames.clear()
+            self.in_flight, self.rows = self.rows, 0
+            return batch
+
+    async def done(self, batch, ok):
+        async with self.changed:
+            if not ok:
+                self.frames.appendleft(batch)
+                self.rows += len(batch)
+            self.in_flight = 0
+            self.changed.notify_all()
+
+
+class SensorService:
+    def __init__(
+        self,
+        engine,
+        flush_rows=FLUSH_ROWS,
+        flush_interval=FLUSH_INTERVAL,
+        capacity=MAX_BUFFERED,
+        strategy="multirow",
+        batch_size=1000,
+        precision=PRECISION,
+        max_retries=MAX_RETRIES,
+        dead_letter=DEAD_LETTER,
+        snapshot=SNAPSHOT_DIR,
+        snapshot_interval=SNAPSHOT_INTERVAL,
+    ):
+        self.engine = engine
+        self.snapshot = snapshot
+        self.snapshot_interval = snapshot_interval
+        self.snapshot_written = 0
+        self.max_retries = max_retries
+        self.dead_letter = dead_letter
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.capacity = capacity
+        self.strategy = strategy
+        self.batch_size = batch_size
+        self.stats = {
+            "requisicoes": 0,
+            "aceitas": 0,
+            "rejeitadas": 0,
+            "recusadas_por_carga": 0,
+            "gravadas": 0,
+            "flushes": 0,
+            "erros_de_gravacao": 0,
+            "descartadas": 0,
+            "ultimo_flush_s": 0.0,
+        }
+        create_schema(engine, if_not_exists=True)
+        with engine.begin() as conn:
+            self.grupos = set(pd.read_sql("SELECT id FROM grupos", conn)["id"])
+            self.locations = LocationIndex(BulkLoader(conn), precision)
+
+    def write(self, df):
+        # Roda numa thread: uma transação por flush, mesmo caminho do init.py.
+        state = set(self.grupos), self.locations.checkpoint()
+        try:
+            with self.engine.begin() as conn:
+                loader = BulkLoader(conn, self.strategy, self.batch_size)
+                # O índice de localizações vive entre flushes; só o loader muda.
+                self.locations.loader = loader
+                insert_rows(df, loader, self.grupos, self.locations)
+        except Exception:
+            self.grupos = state[0]
+            self.locations.restore(state[1])
+            raise
+
+    def isolate(self, batch, error):
+        # Divide o lote ao meio até sobrar só o que o banco recusa; o resto é
+        # gravado normalmente. Devolve quantas gravou e as leituras recusadas.
+        if len(batch) == 1:
+            return 0, [(batch, error)]
+        written, rejected = 0, []
+        middle = len(batch) // 2
+        for half in (batch.iloc[:middle], batch.iloc[middle:]):
+            try:
+                self.write(half)
+                written += len(half)
+            except Exception as exc:
+                done, failed = self.isolate(half, exc)
+                written += done
+                rejected += failed
+        return written, rejected
+
+    def reachable(self):
+        try:
+            with self.engine.connect() as conn:
+                conn.exec_driver_sql("SELECT 1")
+            return True
+        except Exception:
+            return False
+
+    def discard(self, rejected):
+        # Fila de descarte em JSON lines: a leitura e o erro, para reprocessar.
+        with open(self.dead_letter, "a", encoding="utf-8") as f:
+            for rows, exc in rejected:
+                rows.assign(erro=f"{type(exc).__name__}: {exc}").to_json(
+                    f, orient="records", lines=True, force_ascii=False
+                )
+        return sum(len(rows) for rows, _ in rejected)
+
+    async def flusher(self, stop):
+        backoff, failures = self.flush_interval, 0
+        while True:
+            batch = await self.buffer.take(self.flush_rows, self.flush_interval)
+            if batch is None:
+                if stop.is_set():
+                    return
+                continue
+            start = time.perf_counter()
+            try:
+                await asyncio.to_thread(self.write, batch)
+                written = len(batch)
+            except Exception as exc:
+                self.stats["erros_de_gravacao"] += 1
+                failures += 1
+                print(f"Falha ao gravar {len(batch)} leituras: {exc}")
+                if isinstance(exc, TRANSIENT) and failures < self.max_retries:
+                    # Banco indisponível: o lote volta e os produtores esperam.
+                    await self.buffer.done(batch, ok=False)
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, 30.0)
+                    continue
+                if isinstance(exc, TRANSIENT) and not await asyncio.to_thread(
+                    self.reachable
+                ):
+                    # Banco ainda fora: o lote vai inteiro para o descarte.
+                    # Dividi-lo só somaria tentativas contra um banco parado.
+                    written, rejected = 0, [(batch, exc)]
+                else:
+                    # Erro nos dados (o driver às vezes os reporta como
+                    # OperationalError): só as leituras culpadas vão para o
+                    # descarte, e o serviço segue.
+                    written, rejected = await asyncio.to_thread(
+                        self.isolate, batch, exc
+                    )
+                discarded = await asyncio.to_thread(self.discard, rejected)
+                self.stats["descartadas"] += discarded
+                print(
+                    f"{discarded} leituras recusadas pelo banco em {self.dead_letter}"
+                )
+            backoff, failures = self.flush_interval, 0
+            self.stats["flushes"] += 1
+            self.stats["gravadas"] += written
+            self.stats["ultimo_flush_s"] = round(time.perf_counter() - start, 4)
+            await self.buffer.done(batch, ok=True)
+
+    async def refresh_snapshot(self):
+        # Só quando houve gravação desde o último; as amostras novas entram
+        # pela marca d'água do snapshot.
+        written = self.stats["gravadas"]
+        if self.snapshot is None or written == self.snapshot_written:
+            return
+        try:
+            await asyncio.to_thread(refresh, self.engine, (), self.snapshot)
+            self.snapshot_written = written
+        except Exception as exc:
+            print(f"Falha ao atualizar o snapshot: {exc}")
+
+    async def snapshotter(self):
+        while True:
+            await asyncio.sleep(self.snapshot_interval)
+            await self.refresh_snapshot()
+
+    async def normalizer(self):
+        # Junta as requisições que chegaram enquanto o lote anterior era limpo:
+        # uma passada vetorizada por lote em vez de uma por requisição.
+        while True:
+            items = [await self.pending.get()]
+            while not self.pending.empty():
+                items.append(self.pending.get_nowait())
+            try:
+                await self.accept(items)
+            finally:
+                for _ in items:
+                    self.pending.task_done()
+
+    async def accept(self, items):
+        readings = [reading for batch, _ in items for reading in batch]
+        try:
+            df, errors = normalize(readings)
+        except Exception as exc:
+            for _, future in items:
+                future.set_exception(exc)
+            return
+
+        keep = np.ones(len(df), dtype=bool)
+        accepted = []
+        offset = 0
+        for batch, future in items:
+            end = offset + len(batch)
+            failed = [
+                (row - offset, errors[row])
+                for row in range(offset, end)
+                if errors[row] is not None
+            ]
+            if failed:
+                # A requisição é aceita ou recusada inteira.
+                future.set_exception(ValueError("leitura %d: %s" % failed[0]))
+                keep[offset:end] = False
+            else:
+                accepted.append((future, len(batch)))
+            offset = end
+
+        if accepted:
+            try:
+                await self.buffer.put(df[keep].reset_index(drop=True))
+            except Backpressure:
+                for future, _ in accepted:
+                    future.set_exception(Backpressure())
+                return
+        for future, rows in accepted:
+            future.set_result(rows)
+
+    async def route(self, method, path, headers, body):
+        if path == "/saude" and method == "GET":
+            return HTTPStatus.OK, {
+                **self.stats,
+                "no_buffer": self.buffer.rows,
+                "gravando": self.buffer.in_flight,
+                "capacidade": self.buffer.capacity,
+            }
+        if path != "/leituras":
+            return HTTPStatus.NOT_FOUND, {"erro": "rota inexistente"}
+        if method != "POST":
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"erro": "use POST"}
+        if self.closing:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"erro": "serviço encerrando"}
+
+        content_type = headers.get("content-type", "").split(";")[0].strip()
+        try:
+            text = body.decode("utf-8")
+            if content_type == "application/json":
+                readings = json.loads(text)
+            elif content_type in ("text/plain", ""):
+                readings = parse_line_protocol(text)
+            else:
+                return HTTPStatus.UNSUPPORTED_MEDIA_TYPE, {
+                    "erro": "use application/json ou text/plain (line protocol)"
+                }
+            readings = check_structure(readings)
+        except (ValueError, UnicodeDecodeError) as exc:
+            self.stats["rejeitadas"] += 1
+            return HTTPStatus.BAD_REQUEST, {"erro": str(exc)}
+
+        future = asyncio.get_running_loop().create_future()
+        await self.pending.put((readings, future))
+        try:
+            rows = await future
+        except ValueError as exc:
+            self.stats["rejeitadas"] += 1
+            return HTTPStatus.BAD_REQUEST, {"erro": str(exc)}
+        except Backpressure:
+            self.stats["recusadas_por_carga"] += 1
+            return HTTPStatus.SERVICE_UNAVAILABLE, {
+                "erro": "buffer cheio, tente de novo"
+            }
+        self.stats["aceitas"] += rows
+        return HTTPStatus.ACCEPTED, {"aceitas": rows}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+                if not request_line.strip():
+                    break
+                method, path, version = request_line.decode("latin-1").split()
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY:
+                    await self.respond(
+                        writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {}, False
+                    )
+                    break
+                body = await reader.readexactly(length)
+                self.stats["requisicoes"] += 1
+                status, payload = await self.route(
+                    method, path.split("?")[0], headers, body
+                )
+                keep_alive = (
+                    version == "HTTP/1.1"
+                    and headers.get("connection", "").lower() != "close"
+                )
+                await self.respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except ValueError:
+            await self.respond(writer, HTTPStatus.BAD_REQUEST, {}, False)
+        finally:
+            writer.close()
+
+    async def respond(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = [
+            f"HTTP/1.1 {status.value} {status.phrase}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if status == HTTPStatus.SERVICE_UNAVAILABLE:
+            head.append(f"Retry-After: {max(1, round(self.flush_interval))}")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    async def serve(self, host=HOST, port=PORT):
+        self.buffer = Buffer(self.capacity)
+        self.pending = asyncio.Queue(MAX_PENDING)
+        self.closing = False
+        stop, drained = asyncio.Event(), asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+
+        normalizer = asyncio.create_task(self.normalizer())
+        flusher = asyncio.create_task(self.flusher(drained))
+        snapshotter = asyncio.create_task(self.snapshotter())
+        server = await asyncio.start_server(self.handle, host, port, backlog=1024)
+        print(
+            f"Recebendo leituras em http://{host}:{port}/leituras "
+            f"(flush a cada {self.flush_rows} leituras ou {self.flush_interval}s)"
+        )
+        async with server:
+            await stop.wait()
+        # Sem novas leituras: o que já foi aceito é limpo e gravado.
+        self.closing = True
+        await self.pending.join()
+        drained.set()
+        await flusher
+        normalizer.cancel()
+        snapshotter.cancel()
+        await self.refresh_snapshot()
+        print(self.stats)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Serviço HTTP que recebe leituras das sondas Arduino"
+    )
+    parser.add_argument("--url", help="padrão: DATABASE_URL ou o MySQL do .env")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--flush-rows", type=int, default=FLUSH_ROWS)
+    parser.add_argument("--flush-interval", type=float, default=FLUSH_INTERVAL)
+    parser.add_argument("--max-buffered", type=int, default=MAX_BUFFERED)
+    parser.add_argument("--strategy", default="multirow", choices=STRATEGIES[:3])
+    parser.add_argument("--geohash-precision", type=int, default=PRECISION)
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=MAX_RETRIES,
+        help="tentativas com o banco fora antes de isolar as leituras do lote",
+    )
+    parser.add_argument("--dead-letter", default=DEAD_LETTER)
+    parser.add_argument("--snapshot-dir", default=SNAPSHOT_DIR)
+    parser.add_argument(
+        "--snapshot-interval",
+        type=float,
+        default=SNAPSHOT_INTERVAL,
+        help="segundos entre atualizações do snapshot Parquet do dashboard",
+    )
+    parser.add_argument("--no-snapshot", action="store_true")
+    args = parser.parse_args()
+
+    service = SensorService(
+        create_db_engine(args.url),
+        args.flush_rows,
+        args.flush_interval,
+        args.max_buffered,
+        args.strategy,
+        precision=args.geohash_precision,
+        max_retries=args.max_retries,
+        dead_letter=args.dead_letter,
+        snapshot=None if args.no_snapshot else args.snapshot_dir,
+        snapshot_interval=args.snapshot_interval,
+    )
+    asyncio.run(service.serve(args.host, args.port))
@@ -0,0 +1,223 @@
+import argparse
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import text
+
+from db import BASE_DIR, create_db_engine
+
+SNAPSHOT_DIR = Path(os.getenv("SNAPSHOT_DIR", BASE_DIR / ".." / "snapshot")).resolve()
+# Arquivos com "_" ou "." na frente são ignorados pelo pyarrow.dataset.
+MANIFEST = "_estado.json"
+NUMERIC = [
+    "latitude",
+    "longitude",
+    "temperatura_coleta",
+    "temperatura_analise",
+    "turbidez",
+    "ph_fita",
+    "ph_arduino",
+    "umidade",
+]
+QUERY = """
+    SELECT
+        a.id AS amostra_id,
+        a.grupo_id,
+        a.data_inclusao,
+        g.nome AS grupo,
+        l.nome AS local,
+        l.nome AS regiao,
+        l.latitude, l.longitude,
+        l.geohash,
+        qa.temperatura_coleta,
+        qa.temperatura_analise,
+        qa.turbidez,
+        qa.ph_fita,
+        qa.ph_arduino,
+        qa.umidade
+    FROM amostras a
+    LEFT JOIN grupos g ON g.id = a.grupo_id
+    LEFT JOIN localizacao l ON l.id = a.localizacao_id
+    LEFT JOIN qualidade_agua qa ON qa.amostra_id = a.id
+"""
+# A mesma sonda do dashboard: com ela o dashboard sabe se o snapshot está em dia.
+VERSION_QUERY = """
+    SELECT
+        (SELECT MAX(id) FROM amostras) AS ultimo_id,
+        (SELECT MAX(atualizado_em) FROM ingestao_linhas) AS atualizado_em
+"""
+
+
+def partition(grupo_id, mes):
+    return f"grupo_id={grupo_id}/mes={mes}"
+
+
+def month(values):
+    return pd.to_datetime(values).dt.strftime("%Y-%m")
+
+
+def data_version(conn):
+    row = pd.read_sql(VERSION_QUERY, conn).iloc[0]
+    return [
+        int(row["ultimo_id"]) if pd.notna(row["ultimo_id"]) else 0,
+        (
+            str(pd.Timestamp(row["atualizado_em"]))
+            if pd.notna(row["atualizado_em"])
+            else ""
+        ),
+    ]
+
+
+def read_manifest(directory=SNAPSHOT_DIR):
+    path = Path(directory) / MANIFEST
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def replace(path, write):
+    # Grava ao lado e troca de uma vez: quem lê nunca vê arquivo pela metade.
+    tmp = path.with_name(f".{path.name}.tmp")
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def touched(conn, last_id, amostra_ids):
+    # Partições com amostras novas (acima da marca d'água) ou corrigidas.
+    queries = [
+        pd.read_sql(
+            text("SELECT id, grupo_id, data_inclusao FROM amostras WHERE id > :id"),
+            conn,
+            params={"id": last_id},
+        )
+    ]
+    amostra_ids = sorted({int(i) for i in amostra_ids})
+    for start in range(0, len(amostra_ids), 1000):
+        ids = ", ".join(map(str, amostra_ids[start : start + 1000]))
+        queries.append(
+            pd.read_sql(
+                f"SELECT id, grupo_id, data_inclusao FROM amostras WHERE id IN ({ids})",
+                conn,
+            )
+        )
+    rows = pd.concat(queries, ignore_index=True)
+    keys = set(zip(rows["grupo_id"].astype(int), month(rows["data_inclusao"])))
+    return keys, max(last_id, int(rows["id"].max()) if not rows.empty else 0)
+
+
+def partition_rows(conn, keys):
+    # Releitura completa só das partições tocadas, numa consulta só.
+    if not keys:
+        return pd.DataFrame()
+    clauses, params = [], {}
+    for index, (grupo_id, mes) in enumerate(sorted(keys)):
+        start = pd.Timestamp(f"{mes}-01")
+        clauses.append(
+            f"(a.grupo_id = :g{index} AND a.data_inclusao >= :ini{index} "
+            f"AND a.data_inclusao < :fim{index})"
+        )
+        params[f"g{index}"] = grupo_id
+        params[f"ini{index}"] = start.strftime("%Y-%m-%d %H:%M:%S")
+        params[f"fim{index}"] = (start + pd.offsets.MonthBegin()).strftime(
+            "%Y-%m-%d %H:%M:%S"
+        )
+    query = QUERY + " WHERE " + " OR ".join(clauses) + " ORDER BY a.id"
+    return pd.read_sql(text(query), conn, params=params)
+
+
+def write_partitions(directory, df, keys):
+    directory = Path(directory)
+    df = df.assign(mes=month(df["data_inclusao"]) if not df.empty else None)
+    for column in NUMERIC:
+        if column in df:
+            df[column] = pd.to_numeric(df[column], errors="coerce").astype("float64")
+    if "data_inclusao" in df:
+        df["data_inclusao"] = pd.to_datetime(df["data_inclusao"])
+    groups = dict(iter(df.groupby(["grupo_id", "mes"]))) if not df.empty else {}
+
+    rows = {}
+    for grupo_id, mes in keys:
+        path = directory / partition(grupo_id, mes) / "dados.parquet"
+        part = groups.get((grupo_id, mes))
+        if part is None:
+            path.unlink(missing_ok=True)
+            continue
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Os valores das chaves ficam no caminho (grupo_id=3/mes=2025-06).
+        table = pa.Table.from_pandas(
+            part.drop(columns=["grupo_id", "mes"]), preserve_index=False
+        )
+        replace(path, lambda tmp: pq.write_table(table, tmp))
+        rows[partition(grupo_id, mes)] = len(part)
+    return rows
+
+
+def refresh(engine, amostra_ids=(), directory=SNAPSHOT_DIR, full=False):
+    """Atualiza o snapshot Parquet reescrevendo só as partições tocadas.
+
+    Amostras novas são encontradas pela marca d'água de amostras.id; as
+    corrigidas chegam em amostra_ids. Sem estado salvo (ou com full) o
+    snapshot é refeito do zero.
+    """
+    directory = Path(directory)
+    start = time.perf_counter()
+    manifest = None if full else read_manifest(directory)
+    if manifest is None:
+        for old in directory.glob("grupo_id=*"):
+            shutil.rmtree(old)
+        manifest = {"versao": 0, "ultimo_id": 0, "grupos": {}, "particoes": {}}
+    directory.mkdir(parents=True, exist_ok=True)
+
+    with engine.connect() as conn:
+        # Lida antes dos dados: o que entrar durante a leitura deixa o
+        # snapshot marcado como atrasado, nunca como em dia.
+        version = data_version(conn)
+        if manifest["ultimo_id"] == 0:
+            df = pd.read_sql(QUERY + " ORDER BY a.id", conn)
+            keys = set(zip(df["grupo_id"].astype(int), month(df["data_inclusao"])))
+            last_id = int(df["amostra_id"].max()) if not df.empty else 0
+        else:
+            keys, last_id = touched(conn, manifest["ultimo_id"], amostra_ids)
+            df = partition_rows(conn, keys)
+        grupos = pd.read_sql("SELECT id, nome FROM grupos", conn)
+
+    rows = write_partitions(directory, df, keys)
+    for key in keys:
+        manifest["particoes"].pop(partition(*key), None)
+    manifest["particoes"].update(rows)
+    manifest["particoes"] = dict(sorted(manifest["particoes"].items()))
+    manifest["grupos"] = {str(i): nome for i, nome in zip(grupos["id"], grupos["nome"])}
+    manifest["ultimo_id"] = last_id
+    manifest["versao_dados"] = version
+    manifest["versao"] += 1
+    manifest["atualizado_em"] = time.strftime("%Y-%m-%d %H:%M:%S")
+    replace(
+        directory / MANIFEST,
+        lambda tmp: tmp.write_text(json.dumps(manifest, indent=2, ensure_ascii=False)),
+    )
+
+    return {
+        "diretorio": str(directory),
+        "versao": manifest["versao"],
+        "particoes_reescritas": len(keys),
+        "linhas_reescritas": len(df),
+        "particoes": len(manifest["particoes"]),
+        "segundos": round(time.perf_counter() - start, 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Atualiza o snapshot Parquet das amostras para o dashboard"
+    )
+    parser.add_argument("--url", help="padrão: DATABASE_URL ou MySQL do .env")
+    parser.add_argument("--dir", default=SNAPSHOT_DIR)
+    parser.add_argument("--full", action="store_true", help="refaz o snapshot inteiro")
+    args = parser.parse_args()
+    print(refresh(create_db_engine(args.url), directory=args.dir, full=args.full))
@@ -0,0 +1,17 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Os scripts se importam pelo nome (from db import ...), como ao rodar de lá.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+from db import create_db_engine, create_schema  # noqa: E402
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'pi.db'}")
+    create_schema(engine)
+    yield engine
+    engine.dispose()
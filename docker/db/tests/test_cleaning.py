@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cleaning import clean, parse_block
+
+
+@pytest.mark.parametrize(
+    "value, kind, expected",
+    [
+        ("25,3ºC", "decimal", 25.3),
+        ("4,98", "decimal", 4.98),
+        (".5", "decimal", 0.5),
+        (",5", "decimal", 0.5),
+        ("-5", "decimal", -5.0),
+        ("- 5", "decimal", -5.0),
+        ("--5", "decimal", np.nan),
+        ("5-", "decimal", np.nan),
+        ("1.2.3", "decimal", np.nan),
+        ("1" * 15, "decimal", 111111111111111.0),
+        ("1" * 16, "decimal", np.nan),
+        # 130 dígitos davam a volta num contador int8 e viravam 238.
+        ("1" * 130, "decimal", np.nan),
+        ("1" * 300, "decimal", np.nan),
+        ("-45.452.470", "coordinate", -45.452470),
+        ("-22413165", "coordinate", -22.413165),
+        ("--22.4", "coordinate", np.nan),
+        ("4", "integer", 4.0),
+        ("4,0", "integer", np.nan),
+        ("sem leitura", "decimal", np.nan),
+        ("", "decimal", np.nan),
+    ],
+)
+def test_parse_block(value, kind, expected):
+    # Sozinho e no meio de um bloco com strings de outras larguras.
+    for values in ([value], ["7", value, "1" * 40]):
+        result = parse_block(values, kind)[values.index(value)]
+        np.testing.assert_equal(result, expected)
+
+
+def test_clean_rejects_invalid_integers():
+    df = pd.DataFrame({"Grupo": ["1", "2", "3,0"]})
+    with pytest.raises(ValueError, match=r"Grupo: valores inválidos nas linhas \[2\]"):
+        clean(df, {"Grupo": "integer"})
@@ -0,0 +1,151 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from loader import BENCH_COLUMNS, BENCH_TABLE, BulkLoader, check_loaded, synthetic_rows
+
+LOCAIS = pd.DataFrame(
+    {
+        "nome": [f"PREDIO {i}" for i in range(7)],
+        "latitude": [-22.412870, -22.412349, None, -22.4, -22.41, -22.42, -22.43],
+        "longitude": [-45.452470, -45.449622, None, -45.4, -45.45, -45.46, -45.47],
+        "descricao": ["TORNEIRA", None, "LAGO", "POÇA", "BEBEDOURO", "", "X"],
+    }
+)
+
+
+def stored(conn):
+    return pd.read_sql(
+        "SELECT nome, latitude, longitude, descricao FROM localizacao ORDER BY id",
+        conn,
+    )
+
+
+@pytest.mark.parametrize("strategy", ["to_sql", "executemany", "multirow"])
+@pytest.mark.parametrize("batch_size", [1, 3, 1000])
+def test_insert_strategies(engine, strategy, batch_size):
+    with engine.begin() as conn:
+        loader = BulkLoader(conn, strategy, batch_size)
+        assert loader.insert("localizacao", LOCAIS) == len(LOCAIS)
+        assert loader.summary()["localizacao"]["rows"] == len(LOCAIS)
+        pd.testing.assert_frame_equal(stored(conn), LOCAIS, check_dtype=False)
+
+
+@pytest.mark.parametrize("strategy", ["to_sql", "executemany", "multirow"])
+def test_insert_rolls_back_with_transaction(engine, strategy):
+    with pytest.raises(RuntimeError):
+        with engine.begin() as conn:
+            BulkLoader(conn, strategy, 2).insert("localizacao", LOCAIS)
+            raise RuntimeError("falha no meio da carga")
+    with engine.connect() as conn:
+        assert stored(conn).empty
+
+
+def test_invalid_strategies(engine):
+    with engine.connect() as conn:
+        with pytest.raises(ValueError):
+            BulkLoader(conn, "copy")
+        with pytest.raises(ValueError, match="MySQL"):
+            BulkLoader(conn, "infile")
+
+
+def test_empty_insert(engine):
+    with engine.begin() as conn:
+        loader = BulkLoader(conn)
+        assert loader.insert("localizacao", LOCAIS.head(0)) == 0
+        ids = loader.insert("localizacao", LOCAIS.head(0), return_ids=True)
+        assert ids.dtype == np.int64 and len(ids) == 0
+
+
+@pytest.mark.parametrize("strategy", ["to_sql", "executemany", "multirow"])
+def test_return_ids_match_rows_with_gaps(engine, strategy):
+    with engine.begin() as conn:
+        loader = BulkLoader(conn, strategy, batch_size=3)
+        loader.insert("localizacao", LOCAIS.head(5))
+        # AUTOINCREMENT não reaproveita IDs apagados: o próximo lote começa
+        # depois de um buraco.
+        conn.exec_driver_sql("DELETE FROM localizacao WHERE id IN (2, 5)")
+
+        ids = loader.insert("localizacao", LOCAIS, return_ids=True)
+        rows = pd.read_sql(
+            "SELECT id, nome FROM localizacao WHERE id > 5 ORDER BY id", conn
+        )
+    assert ids.dtype == np.int64
+    assert list(ids) == list(rows["id"])
+    assert list(rows["nome"]) == list(LOCAIS["nome"])
+
+
+def fake_loader(dialect, step):
+    conn = SimpleNamespace(dialect=SimpleNamespace(name=dialect))
+    loader = BulkLoader(conn)
+    loader._id_step = step
+    return loader
+
+
+@pytest.mark.parametrize(
+    "dialect, lastrowid, step, expected",
+    [
+        # MySQL devolve o primeiro ID do INSERT de várias linhas.
+        ("mysql", 10, 1, [10, 11, 12, 13]),
+        ("mysql", 10, 2, [10, 12, 14, 16]),
+        # SQLite devolve o último.
+        ("sqlite", 13, 1, [10, 11, 12, 13]),
+        ("sqlite", 16, 2, [10, 12, 14, 16]),
+    ],
+)
+def test_batch_ids(dialect, lastrowid, step, expected):
+    ids = fake_loader(dialect, step).batch_ids(lastrowid, len(expected))
+    assert ids.dtype == np.int64
+    assert list(ids) == expected
+
+
+def test_infile_writes_nulls_mysql_reads_as_null():
+    lines = []
+
+    def execute(statement):
+        path = str(statement).split("'")[1]
+        lines.extend(Path(path).read_text(encoding="utf-8").splitlines())
+        assert "ESCAPED BY ''" in str(statement)
+
+    conn = SimpleNamespace(dialect=SimpleNamespace(name="mysql"), execute=execute)
+    BulkLoader(conn, "infile").insert("localizacao", LOCAIS.head(3))
+    # NULL sem aspas é NULL; textos vão entre aspas, então "NULL" seria texto.
+    assert lines == [
+        '"PREDIO 0",-22.41287,-45.45247,"TORNEIRA"',
+        '"PREDIO 1",-22.412349,-45.449622,NULL',
+        '"PREDIO 2",NULL,NULL,"LAGO"',
+    ]
+
+
+@pytest.mark.parametrize("strategy", ["to_sql", "executemany", "multirow"])
+def test_benchmark_rows_round_trip(engine, strategy):
+    df = synthetic_rows(500)
+    columns = ", ".join(f"{name} {kind}" for name, kind in BENCH_COLUMNS.items())
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"CREATE TABLE {BENCH_TABLE} ({columns})")
+        BulkLoader(conn, strategy, 100).insert(BENCH_TABLE, df)
+        check_loaded(conn, df)
+        # Um NULL gravado como outro valor quebra a comparação.
+        conn.exec_driver_sql(
+            f"UPDATE {BENCH_TABLE} SET local = 'NULL' WHERE local IS NULL"
+        )
+        with pytest.raises(AssertionError):
+            check_loaded(conn, df)
+
+
+def test_update_by_key(engine):
+    with engine.begin() as conn:
+        loader = BulkLoader(conn, batch_size=2)
+        ids = loader.insert("localizacao", LOCAIS, return_ids=True)
+        loader.update(
+            "localizacao",
+            pd.DataFrame({"geohash": ["6gyf4bf1", None, "6gyf4bf0"], "id": ids[:3]}),
+            "id",
+        )
+        geohashes = pd.read_sql("SELECT geohash FROM localizacao ORDER BY id", conn)
+    assert (
+        list(geohashes["geohash"].fillna("")) == ["6gyf4bf1", "", "6gyf4bf0"] + [""] * 4
+    )
@@ -0,0 +1,309 @@
+import asyncio
+import json
+from http import HTTPStatus
+
+import pandas as pd
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from sensors import Buffer, SensorService, normalize, parse_line_protocol
+
+
+def reading(**values):
+    return {
+        "sensor": "sonda-001",
+        "grupo": 4,
+        "latitude": -22.41,
+        "longitude": -45.45,
+        "ph_arduino": 5.0,
+        **values,
+    }
+
+
+@pytest.fixture
+def service(engine, tmp_path):
+    return SensorService(
+        engine,
+        flush_rows=10,
+        flush_interval=0.01,
+        max_retries=3,
+        dead_letter=str(tmp_path / "rejeitadas.jsonl"),
+    )
+
+
+def start(service, capacity=100, timeout=0.05):
+    # O que o serve() monta, sem abrir a porta HTTP.
+    service.buffer = Buffer(capacity, timeout)
+    service.pending = asyncio.Queue()
+    service.closing = False
+    return asyncio.create_task(service.normalizer())
+
+
+async def post(service, body, content_type="application/json"):
+    if content_type == "application/json":
+        body = json.dumps(body)
+    return await service.route(
+        "POST", "/leituras", {"content-type": content_type}, body.encode()
+    )
+
+
+async def flush(service):
+    stop = asyncio.Event()
+    stop.set()
+    await service.flusher(stop)
+
+
+def count(engine, table):
+    with engine.connect() as conn:
+        return int(pd.read_sql(f"SELECT COUNT(*) AS n FROM {table}", conn)["n"][0])
+
+
+def test_normalize_flags_each_invalid_reading():
+    df, errors = normalize(
+        [
+            reading(),
+            reading(ph_arduino="4,98", temperatura_coleta="25,3ºC"),
+            reading(ph_arduino=".5"),
+            reading(ph_arduino=1000),
+            reading(turbidez=100_000_000),
+            reading(grupo=4.0),
+            reading(grupo=0),
+            reading(ph_arduino="sem leitura"),
+            reading(latitude=None),
+            reading(local="x" * 256),
+            reading(ph_arduino=None),
+            reading(timestamp="ontem"),
+        ]
+    )
+    assert errors[:3] == [None, None, None]
+    assert df["Ph(Arduino)"][:3].tolist() == [5.0, 4.98, 0.5]
+    assert df["Temperatura_Coleta"][1] == 25.3
+    assert "Ph(Arduino) fora da faixa" in errors[3]
+    assert "Turbidez(NTU) fora da faixa" in errors[4]
+    assert errors[5].startswith("grupo inválido")
+    assert errors[6].startswith("grupo inválido")
+    assert errors[7].startswith("valor inválido em Ph(Arduino)")
+    assert errors[8].startswith("latitude e longitude")
+    assert errors[9].startswith("local com mais de")
+    assert errors[10] == "leitura sem nenhuma medida"
+    assert errors[11].startswith("timestamp inválido")
+
+
+def test_line_protocol_matches_json():
+    readings = parse_line_protocol(
+        "agua,sensor=sonda-001,grupo=4i latitude=-22.41,longitude=-45.45,"
+        'ph_arduino=5,local="PREDIO L9" 1718000000000000000\n'
+        "# comentário\n"
+    )
+    df, errors = normalize(readings)
+    assert errors == [None]
+    assert df["Local"][0] == "PREDIO L9"
+    assert df["Grupo"][0] == 4
+    assert df["data_inclusao"][0] == "2024-06-10 06:13:20"
+
+
+def test_accepts_and_flushes(service, engine):
+    async def main():
+        normalizer = start(service)
+        statuses = [
+            await post(service, [reading(), reading(turbidez="12,5")]),
+            await post(service, reading(umidade=60)),
+            await post(
+                service,
+                "agua,grupo=7 latitude=-22.4,longitude=-45.4,turbidez=3",
+                "text/plain",
+            ),
+        ]
+        await flush(service)
+        normalizer.cancel()
+        return statuses
+
+    statuses = asyncio.run(main())
+    assert [status for status, _ in statuses] == [HTTPStatus.ACCEPTED] * 3
+    assert [payload["aceitas"] for _, payload in statuses] == [2, 1, 1]
+    assert service.stats["gravadas"] == 4
+    assert count(engine, "amostras") == 4
+    assert count(engine, "qualidade_agua") == 4
+    assert count(engine, "condutividade") == 0
+
+
+def test_rejects_whole_request(service, engine):
+    async def main():
+        normalizer = start(service)
+        rejected = await post(service, [reading(), reading(ph_arduino=1000)])
+        accepted = await post(service, [reading()])
+        await flush(service)
+        normalizer.cancel()
+        return rejected, accepted
+
+    (status, payload), (accepted, _) = asyncio.run(main())
+    assert status == HTTPStatus.BAD_REQUEST
+    assert payload["erro"].startswith("leitura 1: Ph(Arduino) fora da faixa")
+    assert accepted == HTTPStatus.ACCEPTED
+    assert service.stats["rejeitadas"] == 1
+    assert count(engine, "amostras") == 1
+
+
+@pytest.mark.parametrize(
+    "body, content_type, expected",
+    [
+        ("{", "application/json", HTTPStatus.BAD_REQUEST),
+        ("[]", "application/json", HTTPStatus.BAD_REQUEST),
+        ('{"cor": "azul"}', "application/json", HTTPStatus.BAD_REQUEST),
+        ("agua sem_campos", "text/plain", HTTPStatus.BAD_REQUEST),
+        ("<leitura/>", "application/xml", HTTPStatus.UNSUPPORTED_MEDIA_TYPE),
+    ],
+)
+def test_rejects_malformed_body(service, body, content_type, expected):
+    async def main():
+        start(service).cancel()
+        return await post(service, body, content_type)
+
+    status, _ = asyncio.run(main())
+    assert status == expected
+
+
+def test_backpressure_returns_503(service):
+    async def main():
+        normalizer = start(service, capacity=3)
+        # Sem flusher: o buffer enche e a próxima requisição espera o timeout.
+        statuses = [
+            (await post(service, [reading(), reading()]))[0],
+            (await post(service, [reading()]))[0],
+            (await post(service, [reading()]))[0],
+        ]
+        await flush(service)
+        after = (await post(service, [reading()]))[0]
+        normalizer.cancel()
+        return statuses, after
+
+    statuses, after = asyncio.run(main())
+    assert statuses == [
+        HTTPStatus.ACCEPTED,
+        HTTPStatus.ACCEPTED,
+        HTTPStatus.SERVICE_UNAVAILABLE,
+    ]
+    assert after == HTTPStatus.ACCEPTED
+    assert service.stats["recusadas_por_carga"] == 1
+    assert service.stats["gravadas"] == 3
+
+
+def failing_write(service, fail):
+    write = service.write
+
+    def wrapper(df):
+        fail(df)
+        write(df)
+
+    service.write = wrapper
+
+
+def test_dead_letters_rows_the_database_rejects(service, engine):
+    def fail(df):
+        if (df["Turbidez(NTU)"] == 777).any():
+            raise ValueError("Out of range value for column 'turbidez'")
+
+    failing_write(service, fail)
+
+    async def main():
+        service.buffer = Buffer(100)
+        df, _ = normalize(
+            [reading(turbidez=777 if i in (2, 7) else i) for i in range(10)]
+        )
+        await service.buffer.put(df)
+        await flush(service)
+
+    asyncio.run(main())
+    assert service.stats["gravadas"] == 8
+    assert service.stats["descartadas"] == 2
+    assert service.buffer.rows == service.buffer.in_flight == 0
+    assert count(engine, "amostras") == 8
+    rejected = pd.read_json(service.dead_letter, lines=True)
+    assert rejected["Turbidez(NTU)"].tolist() == [777, 777]
+    assert rejected["erro"].str.startswith("ValueError: Out of range").all()
+
+
+def test_transient_errors_are_retried(service, engine):
+    failures = []
+
+    def fail(df):
+        if len(failures) < 2:
+            failures.append(df)
+            raise OperationalError("INSERT", {}, ConnectionError("banco fora"))
+
+    failing_write(service, fail)
+
+    async def main():
+        service.buffer = Buffer(100)
+        df, _ = normalize([reading() for _ in range(5)])
+        await service.buffer.put(df)
+        # O lote volta ao buffer entre as tentativas; o flush final o grava.
+        stop = asyncio.Event()
+        flusher = asyncio.create_task(service.flusher(stop))
+        while service.stats["gravadas"] < 5:
+            await asyncio.sleep(0.01)
+        stop.set()
+        await flusher
+
+    asyncio.run(main())
+    assert service.stats["erros_de_gravacao"] == 2
+    assert service.stats["descartadas"] == 0
+    assert count(engine, "amostras") == 5
+
+
+def test_retries_are_capped_without_bisecting(service, engine):
+    attempts = []
+
+    def fail(df):
+        attempts.append(len(df))
+        raise OperationalError("INSERT", {}, ConnectionError("banco fora"))
+
+    failing_write(service, fail)
+    service.reachable = lambda: False
+
+    async def main():
+        service.buffer = Buffer(100)
+        df, _ = normalize([reading() for _ in range(3)])
+        await service.buffer.put(df)
+        stop = asyncio.Event()
+        flusher = asyncio.create_task(service.flusher(stop))
+        while service.stats["descartadas"] < 3:
+            await asyncio.sleep(0.01)
+        stop.set()
+        await flusher
+
+    asyncio.run(main())
+    # Com o banco fora, o lote vai inteiro para o descarte, sem ser dividido.
+    assert attempts == [3] * service.max_retries
+    assert service.stats["erros_de_gravacao"] == service.max_retries
+    assert service.buffer.rows == service.buffer.in_flight == 0
+    assert count(engine, "amostras") == 0
+    rejected = pd.read_json(service.dead_letter, lines=True)
+    assert len(rejected) == 3
+    assert rejected["erro"].str.startswith("OperationalError").all()
+
+
+def test_operational_data_errors_are_bisected(service, engine):
+    # O pymysql reporta alguns erros de dados como OperationalError; com o
+    # banco de pé, o lote é dividido como num erro de dados comum.
+    def fail(df):
+        if (df["Turbidez(NTU)"] == 777).any():
+            raise OperationalError("INSERT", {}, ValueError("Incorrect value"))
+
+    failing_write(service, fail)
+
+    async def main():
+        service.buffer = Buffer(100)
+        df, _ = normalize([reading(turbidez=777 if i == 3 else i) for i in range(6)])
+        await service.buffer.put(df)
+        stop = asyncio.Event()
+        flusher = asyncio.create_task(service.flusher(stop))
+        while service.stats["descartadas"] < 1:
+            await asyncio.sleep(0.01)
+        stop.set()
+        await flusher
+
+    asyncio.run(main())
+    assert service.stats["gravadas"] == 5
+    assert count(engine, "amostras") == 5
+    assert len(pd.read_json(service.dead_letter, lines=True)) == 1
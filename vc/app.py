@@ -1,16 +1,135 @@
+import os
+import tempfile
+import time
+from pathlib import Path
+
+STARTED_AT = time.perf_counter()
+
 import gradio as gr
-import tensorflow as tf
-import numpy as np
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from backends import model_file
+from batching import MicroBatcher
+from bulk import classify_folder
+from cache import PredictionCache
+from loader import ModelLoader
+from metrics import Metrics
+from preprocessing import load_image
+from workers import WorkerPool
+
+MODEL_PATH = os.getenv("VC_MODEL_PATH", "model.keras")
+MAX_BATCH_SIZE = int(os.getenv("VC_MAX_BATCH_SIZE", 8))
+MAX_WAIT_MS = float(os.getenv("VC_MAX_WAIT_MS", 10))
+BACKEND = os.getenv("VC_BACKEND", "keras")
+USE_XLA = os.getenv("VC_XLA") == "1"
+LOAD_TIMEOUT = float(os.getenv("VC_LOAD_TIMEOUT", 120))
+WORKERS = int(os.getenv("VC_WORKERS", 0))
 
-model = tf.keras.models.load_model("model.keras")
+if WORKERS > 0:
+    loader = WorkerPool(
+        MODEL_PATH,
+        backend=BACKEND,
+        workers=WORKERS,
+        threads=int(os.getenv("VC_WORKER_THREADS", 0)) or None,
+        max_batch_size=MAX_BATCH_SIZE,
+    ).start()
+else:
+    loader = ModelLoader(
+        MODEL_PATH,
+        backend=BACKEND,
+        jit_compile=USE_XLA,
+        warmup_batch_sizes=(
+            range(1, MAX_BATCH_SIZE + 1) if USE_XLA else (1, MAX_BATCH_SIZE)
+        ),
+    ).start()
 labels = ["limpa", "suja"]
 
 
+def get_engine():
+    try:
+        return loader.wait(LOAD_TIMEOUT)
+    except (TimeoutError, RuntimeError) as exc:
+        raise gr.Error(str(exc))
+
+
+batcher = MicroBatcher(
+    lambda batch: get_engine()(batch),
+    max_batch_size=MAX_BATCH_SIZE,
+    max_wait_ms=MAX_WAIT_MS,
+    verbose=os.getenv("VC_BATCH_LOG") == "1",
+    dispatchers=max(1, WORKERS),
+)
+
+SLOW_REQUEST_MS = os.getenv("VC_SLOW_REQUEST_MS")
+metrics = Metrics(slow_request_ms=float(SLOW_REQUEST_MS) if SLOW_REQUEST_MS else None)
+metrics.gauge(
+    "batch_occupancy",
+    "Ocupação média dos lotes recentes.",
+    lambda: batcher.stats()["recent_occupancy"],
+)
+metrics.gauge("queue_depth", "Imagens aguardando lote.", lambda: batcher.queue.qsize())
+metrics.gauge(
+    "model_ready",
+    "1 quando o modelo está pronto para inferência.",
+    lambda: loader.status()["status"] == "ready",
+)
+
+CACHE_ENTRIES = int(os.getenv("VC_CACHE_ENTRIES", 1024))
+cache = (
+    PredictionCache(
+        model_file(MODEL_PATH, BACKEND),
+        max_entries=CACHE_ENTRIES,
+        max_bytes=int(float(os.getenv("VC_CACHE_MB", 16)) * 1024 * 1024),
+        perceptual=os.getenv("VC_CACHE_PHASH") == "1",
+        max_distance=int(os.getenv("VC_CACHE_PHASH_DISTANCE", 4)),
+    )
+    if CACHE_ENTRIES > 0
+    else None
+)
+if cache:
+    metrics.gauge(
+        "cache_hits_total", "Acertos do cache.", lambda: cache.hits, kind="counter"
+    )
+    metrics.gauge(
+        "cache_misses_total", "Faltas do cache.", lambda: cache.misses, kind="counter"
+    )
+    metrics.gauge("cache_entries", "Entradas no cache.", lambda: len(cache.entries))
+
+
+def classify_zip(zip_file):
+    out = os.path.join(tempfile.mkdtemp(), Path(zip_file).stem + "_predicoes.csv")
+    summary = classify_folder(zip_file, out, get_engine(), batch_size=MAX_BATCH_SIZE)
+    return out, summary
+
+
+def predict(image, stages):
+    image = load_image(image, size=get_engine().input_size, timings=stages)
+
+    start = time.perf_counter()
+    preds = cache.get(image) if cache else None
+    stages["cache"] = time.perf_counter() - start
+    if preds is None:
+        future = batcher.submit(image)
+        preds = future.result()
+        stages["queue"] = future.queue_s
+        stages["inference"] = future.inference_s
+        if cache:
+            cache.put(image, preds)
+    return preds
+
+
 def classify(image):
-    image = image.resize((224, 224))
-    image = np.array(image) / 255.0
-    image = np.expand_dims(image, axis=0)
-    preds = model.predict(image)[0]
+    stages = {}
+    start = time.perf_counter()
+    try:
+        preds = predict(image, stages)
+    except Exception:
+        metrics.observe(stages, time.perf_counter() - start, error=True)
+        raise
+    label = labels[int(preds.argmax())]
+    metrics.observe(stages, time.perf_counter() - start, label=label)
     return {labels[i]: float(preds[i]) for i in range(len(labels))}
 
 
@@ -96,18 +215,43 @@ with gr.Blocks() as app:
 
     gr.Markdown("<h1 class='title'>Análise de Turbidez</h1>")
 
-    with gr.Row():
-        with gr.Column(scale=1):
-            image_input = gr.Image(
-                type="pil", label="Envie a foto do casco", height=360
-            )
-
-        with gr.Column(scale=1):
-            output_label = gr.Label(
-                label="Resultado", num_top_classes=2, elem_classes=["output_class"]
-            )
-            classify_btn = gr.Button("Classificar", elem_classes=["btn-classificar"])
-            classify_btn.click(classify, inputs=image_input, outputs=output_label)
+    with gr.Tab("Imagem"):
+        with gr.Row():
+            with gr.Column(scale=1):
+                image_input = gr.Image(
+                    type="filepath", label="Envie a foto do casco", height=360
+                )
+
+            with gr.Column(scale=1):
+                output_label = gr.Label(
+                    label="Resultado", num_top_classes=2, elem_classes=["output_class"]
+                )
+                classify_btn = gr.Button(
+                    "Classificar", elem_classes=["btn-classificar"]
+                )
+                classify_btn.click(
+                    classify,
+                    inputs=image_input,
+                    outputs=output_label,
+                    concurrency_limit=MAX_BATCH_SIZE * max(1, WORKERS),
+                )
+
+    with gr.Tab("Lote"):
+        with gr.Row():
+            with gr.Column(scale=1):
+                zip_input = gr.File(
+                    label="Envie um .zip com as fotos", file_types=[".zip"]
+                )
+                bulk_btn = gr.Button(
+                    "Classificar lote", elem_classes=["btn-classificar"]
+                )
+
+            with gr.Column(scale=1):
+                csv_output = gr.File(label="Resultados (CSV)")
+                bulk_summary = gr.JSON(label="Resumo")
+                bulk_btn.click(
+                    classify_zip, inputs=zip_input, outputs=[csv_output, bulk_summary]
+                )
     gr.HTML(
         """
 <div class="image">
@@ -116,4 +260,26 @@ with gr.Blocks() as app:
 """
     )
 
-app.launch(server_name="0.0.0.0", server_port=7860, ssr_mode=False)
+server = FastAPI()
+
+
+@server.get("/health")
+def health():
+    return {"status": "ok", "uptime_s": round(time.perf_counter() - STARTED_AT, 3)}
+
+
+@server.get("/ready")
+def ready():
+    status = loader.status()
+    return JSONResponse(status, status_code=200 if status["status"] == "ready" else 503)
+
+
+@server.get("/metrics")
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+server = gr.mount_gradio_app(server, app, path="/", ssr_mode=False)
+print(f"Interface pronta em {time.perf_counter() - STARTED_AT:.2f}s")
+
+uvicorn.run(server, host="0.0.0.0", port=7860)
@@ -0,0 +1,41 @@
+import json
+import zipfile
+from pathlib import Path
+
+TFLITE_VARIANTS = ["fp32", "dynamic", "int8"]
+BACKENDS = ["keras"] + [f"tflite-{variant}" for variant in TFLITE_VARIANTS]
+
+
+def tflite_path(model_path, variant):
+    path = Path(model_path)
+    return str(path.with_name(f"{path.stem}_{variant}.tflite"))
+
+
+def model_file(model_path, backend):
+    if backend == "keras":
+        return model_path
+    return tflite_path(model_path, backend.removeprefix("tflite-"))
+
+
+def input_size(model_path, default=(224, 224)):
+    # Lê (largura, altura) do config.json do .keras sem importar o TensorFlow.
+    try:
+        with zipfile.ZipFile(model_path) as archive:
+            config = json.loads(archive.read("config.json"))
+        shape = config.get("build_config", {}).get("input_shape") or next(
+            layer["config"]["batch_shape"]
+            for layer in config["config"]["layers"]
+            if layer["class_name"] == "InputLayer"
+        )
+        return shape[2], shape[1]
+    except (
+        OSError,
+        zipfile.BadZipFile,
+        KeyError,
+        ValueError,
+        StopIteration,
+        IndexError,
+        TypeError,
+    ):
+        # Arquivo ausente, não é .keras ou config sem a forma de entrada.
+        return default
@@ -0,0 +1,138 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from queue import Empty, Queue
+
+import numpy as np
+
+
+class MicroBatcher:
+    def __init__(
+        self, predict_fn, max_batch_size=8, max_wait_ms=10, verbose=False, dispatchers=1
+    ):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.verbose = verbose
+
+        self.queue = Queue()
+        self.lock = threading.Lock()
+        self.batches = 0
+        self.requests = 0
+        self.size_counts = [0] * (max_batch_size + 1)
+        self.recent = deque(maxlen=100)
+        self.local = threading.local()
+
+        self.running = True
+        self.threads = [
+            threading.Thread(target=self._run, daemon=True) for _ in range(dispatchers)
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, image):
+        future = Future()
+        future.submitted_at = time.perf_counter()
+        self.queue.put((image, future))
+        return future
+
+    def predict(self, image):
+        return self.submit(image).result()
+
+    def close(self):
+        self.running = False
+        for _ in self.threads:
+            self.queue.put(None)
+        for thread in self.threads:
+            thread.join()
+
+    def stats(self):
+        with self.lock:
+            batches = self.batches
+            requests = self.requests
+            sizes = list(self.size_counts)
+            recent = list(self.recent)
+        return {
+            "batches": batches,
+            "requests": requests,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "mean_batch_size": requests / batches if batches else 0.0,
+            "mean_occupancy": (
+                requests / (batches * self.max_batch_size) if batches else 0.0
+            ),
+            "recent_occupancy": (
+                sum(recent) / (len(recent) * self.max_batch_size) if recent else 0.0
+            ),
+            "batch_size_histogram": {
+                size: count for size, count in enumerate(sizes) if count
+            },
+        }
+
+    def _collect(self):
+        item = self.queue.get()
+        if item is None:
+            return []
+        batch = [item]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self.queue.get(timeout=remaining)
+            except Empty:
+                break
+            if item is None:
+                self.running = False
+                self.queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _stack(self, images):
+        first = images[0]
+        buffer = getattr(self.local, "buffer", None)
+        if buffer is None or buffer.shape[1:] != first.shape:
+            buffer = np.empty((self.max_batch_size, *first.shape), dtype=first.dtype)
+            self.local.buffer = buffer
+        return np.stack(images, out=buffer[: len(images)])
+
+    def _run(self):
+        while self.running:
+            batch = self._collect()
+            if not batch:
+                continue
+
+            images = [image for image, _ in batch]
+            futures = [future for _, future in batch]
+            start = time.perf_counter()
+            try:
+                preds = self.predict_fn(self._stack(images))
+            except Exception as exc:
+                preds = None
+                error = exc
+            elapsed = time.perf_counter() - start
+
+            for i, future in enumerate(futures):
+                future.queue_s = start - future.submitted_at
+                future.inference_s = elapsed
+                future.batch_size = len(batch)
+                if preds is None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(preds[i])
+
+            with self.lock:
+                self.batches += 1
+                self.requests += len(batch)
+                self.size_counts[len(batch)] += 1
+                self.recent.append(len(batch))
+
+            if self.verbose:
+                print(
+                    f"[batch] tamanho={len(batch)}/{self.max_batch_size} "
+                    f"ocupacao={len(batch) / self.max_batch_size:.0%} "
+                    f"tempo={elapsed * 1000:.1f}ms"
+                )
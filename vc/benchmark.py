@@ -0,0 +1,302 @@
+import argparse
+import io
+import itertools
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from preprocessing import load_image
+
+METRICS = {
+    "images_per_sec": "higher",
+    "p50_ms": "lower",
+    "p95_ms": "lower",
+    "p99_ms": "lower",
+    "model_load_s": "lower",
+    "peak_rss_mb": "lower",
+}
+
+
+def synthetic_images(count=8, size=(1280, 960), seed=0):
+    rng = np.random.default_rng(seed)
+    images = []
+    for _ in range(count):
+        pixels = rng.integers(0, 255, (size[1] // 8, size[0] // 8, 3), dtype=np.uint8)
+        buffer = io.BytesIO()
+        Image.fromarray(pixels).resize(size).save(buffer, format="JPEG", quality=90)
+        images.append(buffer.getvalue())
+    return images
+
+
+def folder_images(folder, count=32):
+    paths = sorted(
+        path
+        for path in Path(folder).rglob("*")
+        if path.suffix.lower() in {".jpg", ".jpeg", ".png"}
+    )
+    return [path.read_bytes() for path in paths[:count]]
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def load(model_path, backend, threads, batch_sizes, workers):
+    # Sem workers o modelo roda neste processo; com workers, como no app com
+    # VC_WORKERS, cada lote vai para um processo do WorkerPool.
+    start = time.perf_counter()
+    if workers:
+        from workers import WorkerPool
+
+        engine = WorkerPool(
+            model_path,
+            backend=backend,
+            workers=workers,
+            threads=threads or None,
+            max_batch_size=max(batch_sizes),
+        )
+        engine.start().wait()
+        return engine, time.perf_counter() - start, 0.0
+
+    from serving import load_engine
+
+    engine = load_engine(
+        model_path,
+        backend=backend,
+        warmup_batch_sizes=sorted(set([1, *batch_sizes])),
+        threads=threads or None,
+    )
+    return engine, time.perf_counter() - start - engine.warmup_s, engine.warmup_s
+
+
+def run_config(
+    model_path, backend, threads, batch_sizes, images, requests, max_wait_ms, workers=0
+):
+    from batching import MicroBatcher
+
+    engine, model_load_s, warmup_s = load(
+        model_path, backend, threads, batch_sizes, workers
+    )
+
+    results = []
+    for batch_size in batch_sizes:
+        batcher = MicroBatcher(
+            engine,
+            max_batch_size=batch_size,
+            max_wait_ms=max_wait_ms,
+            dispatchers=max(1, workers),
+        )
+        latencies = []
+        lock = threading.Lock()
+        # Clientes suficientes para encher um lote em cada worker.
+        n_clients = batch_size * max(1, workers)
+        per_client = max(1, requests // n_clients)
+
+        def client(offset):
+            for i in range(per_client):
+                data = images[(offset + i) % len(images)]
+                begin = time.perf_counter()
+                batcher.predict(load_image(data, size=engine.input_size))
+                elapsed = (time.perf_counter() - begin) * 1000
+                with lock:
+                    latencies.append(elapsed)
+
+        clients = [threading.Thread(target=client, args=(i,)) for i in range(n_clients)]
+        begin = time.perf_counter()
+        for thread in clients:
+            thread.start()
+        for thread in clients:
+            thread.join()
+        wall = time.perf_counter() - begin
+        stats = batcher.stats()
+        batcher.close()
+
+        results.append(
+            {
+                "backend": backend,
+                "threads": threads,
+                "workers": workers,
+                "batch_size": batch_size,
+                "requests": len(latencies),
+                "images_per_sec": len(latencies) / wall,
+                "p50_ms": float(np.percentile(latencies, 50)),
+                "p95_ms": float(np.percentile(latencies, 95)),
+                "p99_ms": float(np.percentile(latencies, 99)),
+                "mean_occupancy": stats["mean_occupancy"],
+                "model_load_s": model_load_s,
+                "warmup_s": warmup_s,
+                "peak_rss_mb": peak_rss_mb(),
+            }
+        )
+    if workers:
+        engine.close()
+    return results
+
+
+def add_speedup(results):
+    # Vazão relativa à mesma configuração com menos workers: com núcleos
+    # sobrando, deveria crescer perto de 1x por worker.
+    first = {}
+    for row in sorted(results, key=lambda row: row["workers"]):
+        key = row["backend"], row["threads"], row["batch_size"]
+        base = first.setdefault(key, row)
+        row["speedup"] = row["images_per_sec"] / base["images_per_sec"]
+
+
+def run(args):
+    results = []
+    for backend, threads, workers in itertools.product(
+        args.backends, args.threads, args.workers
+    ):
+        command = [
+            sys.executable,
+            __file__,
+            "_worker",
+            "--model",
+            args.model,
+            "--backend",
+            backend,
+            "--threads",
+            str(threads),
+            "--workers",
+            str(workers),
+            "--batch-sizes",
+            *map(str, args.batch_sizes),
+            "--requests",
+            str(args.requests),
+            "--max-wait-ms",
+            str(args.max_wait_ms),
+        ]
+        if args.images:
+            command += ["--images", args.images]
+        print(f"Backend {backend}, {threads} threads, {workers} workers...", flush=True)
+        output = subprocess.run(
+            command, check=True, capture_output=True, text=True
+        ).stdout
+        results += json.loads(output.strip().splitlines()[-1])
+
+    add_speedup(results)
+    report = {
+        "meta": {
+            "model": args.model,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+            "requests": args.requests,
+            "max_wait_ms": args.max_wait_ms,
+        },
+        "results": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for row in results:
+        print(
+            f"{row['backend']:15s} threads={row['threads']:<3} "
+            f"workers={row['workers']:<2} "
+            f"batch={row['batch_size']:<3} {row['images_per_sec']:7.1f} img/s "
+            f"({row['speedup']:.2f}x) "
+            f"p50={row['p50_ms']:.1f}ms p95={row['p95_ms']:.1f}ms "
+            f"p99={row['p99_ms']:.1f}ms rss={row['peak_rss_mb']:.0f}MB"
+        )
+    print(f"Relatório salvo em {args.out}")
+
+
+def worker(args):
+    images = folder_images(args.images) if args.images else synthetic_images()
+    results = run_config(
+        args.model,
+        args.backend,
+        args.threads,
+        args.batch_sizes,
+        images,
+        args.requests,
+        args.max_wait_ms,
+        args.workers,
+    )
+    print(json.dumps(results))
+
+
+def compare(args):
+    baseline = json.load(open(args.baseline))["results"]
+    current = json.load(open(args.current))["results"]
+
+    def key(row):
+        # Relatórios de antes da varredura de workers rodavam sem pool.
+        return row["backend"], row["threads"], row.get("workers", 0), row["batch_size"]
+
+    baseline = {key(row): row for row in baseline}
+    regressions = []
+    for row in current:
+        base = baseline.get(key(row))
+        if base is None:
+            continue
+        for metric, better in METRICS.items():
+            if not base.get(metric):
+                continue
+            change = (row[metric] - base[metric]) / base[metric]
+            if better == "higher":
+                change = -change
+            status = "REGRESSÃO" if change > args.threshold else "ok"
+            print(
+                f"{str(key(row)):32s} {metric:15s} "
+                f"{base[metric]:10.2f} -> {row[metric]:10.2f} "
+                f"({change:+.1%}) {status}"
+            )
+            if change > args.threshold:
+                regressions.append((key(row), metric, change))
+
+    if regressions:
+        print(f"\n{len(regressions)} regressões acima de {args.threshold:.0%}")
+        sys.exit(1)
+    print("\nSem regressões")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark de inferência do classificador de turbidez"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    for name in ("run", "_worker"):
+        sub = commands.add_parser(name)
+        sub.add_argument("--model", default=os.getenv("VC_MODEL_PATH", "model.keras"))
+        sub.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8, 16])
+        sub.add_argument("--requests", type=int, default=64)
+        sub.add_argument("--max-wait-ms", type=float, default=10)
+        sub.add_argument("--images", help="pasta com imagens reais (opcional)")
+
+    run_parser = commands.choices["run"]
+    run_parser.add_argument("--backends", nargs="+", default=["keras"])
+    run_parser.add_argument("--threads", type=int, nargs="+", default=[0])
+    run_parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=[0],
+        help="varredura de processos do WorkerPool (0 = modelo no processo)",
+    )
+    run_parser.add_argument("--out", default="benchmark.json")
+
+    worker_parser = commands.choices["_worker"]
+    worker_parser.add_argument("--backend", default="keras")
+    worker_parser.add_argument("--threads", type=int, default=0)
+    worker_parser.add_argument("--workers", type=int, default=0)
+
+    compare_parser = commands.add_parser("compare")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10)
+
+    args = parser.parse_args()
+    {"run": run, "_worker": worker, "compare": compare}[args.command](args)
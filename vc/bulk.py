@@ -0,0 +1,227 @@
+import argparse
+import csv
+import os
+import threading
+import time
+import zipfile
+from collections import deque
+from contextlib import ExitStack
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from backends import BACKENDS
+from preprocessing import BatchBuffer, load_image
+
+LABELS = ["limpa", "suja"]
+COLUMNS = ["arquivo", "limpa", "suja", "classe", "erro"]
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+
+
+def is_image(name):
+    return Path(name).suffix.lower() in IMAGE_EXTENSIONS
+
+
+def iter_sources(src, stack):
+    src = Path(src)
+    if src.is_file() and zipfile.is_zipfile(src):
+        archive = stack.enter_context(zipfile.ZipFile(src))
+        lock = threading.Lock()
+
+        def reader(name):
+            def read():
+                with lock:
+                    return archive.read(name)
+
+            return read
+
+        for name in sorted(archive.namelist()):
+            if not name.endswith("/") and is_image(name):
+                yield name, reader(name)
+    else:
+        for path in sorted(src.rglob("*")):
+            if path.is_file() and is_image(path.name):
+                yield str(path.relative_to(src)), path.read_bytes
+
+
+def decode(source, out):
+    name, read = source
+    try:
+        load_image(read(), size=(out.shape[1], out.shape[0]), out=out)
+        return name, None
+    except Exception as exc:
+        return name, str(exc)
+
+
+class CsvWriter:
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def done(self):
+        if not self.path.exists():
+            return set()
+        with open(self.path, newline="", encoding="utf-8") as f:
+            return {row["arquivo"] for row in csv.DictReader(f)}
+
+    def write(self, rows):
+        new = not self.path.exists()
+        with open(self.path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=COLUMNS)
+            if new:
+                writer.writeheader()
+            writer.writerows(rows)
+
+
+class ParquetWriter:
+    def __init__(self, path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.pa = pa
+        self.pq = pq
+        # Esquema fixo: uma parte só com erros teria limpa/suja do tipo null e
+        # não leria junto com as outras.
+        self.schema = pa.schema(
+            [
+                ("arquivo", pa.string()),
+                ("limpa", pa.float64()),
+                ("suja", pa.float64()),
+                ("classe", pa.string()),
+                ("erro", pa.string()),
+            ]
+        )
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.part = len(list(self.path.glob("part-*.parquet")))
+
+    def done(self):
+        names = set()
+        for part in self.path.glob("part-*.parquet"):
+            names.update(self.pq.read_table(part, columns=["arquivo"])[0].to_pylist())
+        return names
+
+    def write(self, rows):
+        table = self.pa.Table.from_pylist(rows, schema=self.schema)
+        self.pq.write_table(table, self.path / f"part-{self.part:05d}.parquet")
+        self.part += 1
+
+
+def open_writer(path):
+    if str(path).endswith(".parquet"):
+        return ParquetWriter(path)
+    return CsvWriter(path)
+
+
+def predict_rows(engine, decoded, buffer):
+    ok = [i for i, (_, error) in enumerate(decoded) if error is None]
+    rows = [
+        {"arquivo": name, "limpa": None, "suja": None, "classe": None, "erro": error}
+        for name, error in decoded
+        if error is not None
+    ]
+    if ok:
+        if len(ok) == len(decoded):
+            batch = buffer[: len(ok)]
+        else:
+            batch = buffer[ok]
+        preds = engine(batch)
+        for i, pred in zip(ok, preds):
+            name = decoded[i][0]
+            rows.append(
+                {
+                    "arquivo": name,
+                    "limpa": float(pred[0]),
+                    "suja": float(pred[1]),
+                    "classe": LABELS[int(np.argmax(pred))],
+                    "erro": "",
+                }
+            )
+    return rows
+
+
+def chunked(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def classify_folder(
+    src, out, engine, batch_size=32, workers=os.cpu_count(), prefetch=2, log_every=10
+):
+    writer = open_writer(out)
+    done = writer.done()
+    if done:
+        print(f"Retomando: {len(done)} imagens já processadas em {out}")
+
+    processed = errors = batches = 0
+    start = time.perf_counter()
+
+    buffers = [BatchBuffer(batch_size, engine.input_size) for _ in range(prefetch + 1)]
+
+    def flush(futures, buffer):
+        nonlocal processed, errors, batches
+        rows = predict_rows(engine, [future.result() for future in futures], buffer)
+        writer.write(rows)
+        processed += len(rows)
+        errors += sum(1 for row in rows if row["erro"])
+        batches += 1
+        if batches % log_every == 0:
+            elapsed = time.perf_counter() - start
+            print(f"{processed} imagens ({processed / elapsed:.1f} img/s)")
+
+    with ExitStack() as stack, ThreadPoolExecutor(max_workers=workers) as pool:
+        sources = (
+            source for source in iter_sources(src, stack) if source[0] not in done
+        )
+        pending = deque()
+        for index, chunk in enumerate(chunked(sources, batch_size)):
+            buffer = buffers[index % len(buffers)]
+            futures = [
+                pool.submit(decode, source, buffer[slot])
+                for slot, source in enumerate(chunk)
+            ]
+            pending.append((futures, buffer))
+            if len(pending) > prefetch:
+                flush(*pending.popleft())
+        while pending:
+            flush(*pending.popleft())
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        "processadas": processed,
+        "erros": errors,
+        "retomadas": len(done),
+        "segundos": round(elapsed, 2),
+        "img_por_segundo": round(processed / elapsed, 2) if elapsed else 0.0,
+        "saida": str(out),
+    }
+    print(summary)
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Classifica uma pasta ou .zip de imagens em lote"
+    )
+    parser.add_argument("src", help="pasta ou arquivo .zip com as imagens")
+    parser.add_argument("out", help="arquivo .csv ou pasta .parquet de saída")
+    parser.add_argument("--model", default=os.getenv("VC_MODEL_PATH", "model.keras"))
+    parser.add_argument("--backend", default="keras", choices=BACKENDS)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    from serving import load_engine
+
+    engine = load_engine(
+        args.model, backend=args.backend, warmup_batch_sizes=(args.batch_size,)
+    )
+    classify_folder(
+        args.src, args.out, engine, batch_size=args.batch_size, workers=args.workers
+    )
@@ -0,0 +1,123 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image
+
+
+def tensor_key(tensor):
+    return hashlib.blake2b(
+        np.ascontiguousarray(tensor).tobytes(), digest_size=16
+    ).hexdigest()
+
+
+def dhash(tensor, size=8):
+    gray = np.asarray(tensor, dtype=np.float32).mean(axis=2)
+    small = np.asarray(Image.fromarray(gray).resize((size + 1, size), Image.BOX))
+    bits = np.packbits(small[:, 1:] > small[:, :-1])
+    return int.from_bytes(bits.tobytes(), "big")
+
+
+class PredictionCache:
+    def __init__(
+        self,
+        model_path,
+        max_entries=1024,
+        max_bytes=16 * 1024 * 1024,
+        perceptual=False,
+        max_distance=4,
+    ):
+        self.model_path = model_path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.perceptual = perceptual
+        self.max_distance = max_distance
+
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.lock = threading.Lock()
+        self.model_stamp = self._model_stamp()
+
+    def _model_stamp(self):
+        try:
+            stat = os.stat(self.model_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _check_model(self):
+        stamp = self._model_stamp()
+        if stamp != self.model_stamp:
+            self.model_stamp = stamp
+            self.entries.clear()
+            self.bytes = 0
+            self.invalidations += 1
+
+    def get(self, tensor):
+        key = tensor_key(tensor)
+        phash = dhash(tensor) if self.perceptual else None
+        with self.lock:
+            self._check_model()
+            entry = self.entries.get(key)
+            if entry is None and phash is not None:
+                key, entry = self._nearest(phash)
+                if entry is not None:
+                    self.near_hits += 1
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, tensor, preds):
+        key = tensor_key(tensor)
+        phash = dhash(tensor) if self.perceptual else None
+        preds = np.array(preds, copy=True)
+        size = preds.nbytes + len(key) + 8
+        with self.lock:
+            self._check_model()
+            if key in self.entries:
+                self.bytes -= self.entries.pop(key)[2]
+            self.entries[key] = (preds, phash, size)
+            self.bytes += size
+            while self.entries and (
+                len(self.entries) > self.max_entries or self.bytes > self.max_bytes
+            ):
+                _, (_, _, evicted) = self.entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def _nearest(self, phash):
+        best_key, best_entry, best_distance = None, None, self.max_distance + 1
+        for key, entry in self.entries.items():
+            distance = (phash ^ entry[1]).bit_count()
+            if distance < best_distance:
+                best_key, best_entry, best_distance = key, entry, distance
+        return best_key, best_entry
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.bytes,
+                "hits": self.hits,
+                "near_hits": self.near_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,95 @@
+import os
+import time
+from pathlib import Path
+
+import tensorflow as tf
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".gif"}
+AUTOTUNE = tf.data.AUTOTUNE
+
+
+def split_files(train_dir, validation_split=0.2):
+    train_dir = Path(train_dir)
+    class_names = sorted(path.name for path in train_dir.iterdir() if path.is_dir())
+
+    train_files, train_labels, val_files, val_labels = [], [], [], []
+    for label, name in enumerate(class_names):
+        files = sorted(
+            str(path)
+            for path in (train_dir / name).rglob("*")
+            if path.suffix.lower() in IMAGE_EXTENSIONS
+        )
+        split = int(validation_split * len(files))
+        val_files += files[:split]
+        val_labels += [label] * split
+        train_files += files[split:]
+        train_labels += [label] * (len(files) - split)
+
+    return class_names, (train_files, train_labels), (val_files, val_labels)
+
+
+def decode(path, img_size):
+    image = tf.io.decode_image(
+        tf.io.read_file(path), channels=3, expand_animations=False
+    )
+    image = tf.image.resize(image, img_size, antialias=True)
+    return tf.cast(tf.clip_by_value(tf.round(image), 0, 255), tf.uint8)
+
+
+def make_dataset(
+    files,
+    labels,
+    num_classes,
+    img_size=(224, 224),
+    batch_size=16,
+    training=False,
+    cache="memory",
+    seed=42,
+):
+    ds = tf.data.Dataset.from_tensor_slices((files, labels))
+    ds = ds.map(
+        lambda path, label: (decode(path, img_size), label),
+        num_parallel_calls=AUTOTUNE,
+        deterministic=True,
+    )
+    if cache == "memory":
+        ds = ds.cache()
+    elif cache:
+        os.makedirs(cache, exist_ok=True)
+        ds = ds.cache(os.path.join(cache, "train" if training else "val"))
+
+    if training:
+        ds = ds.shuffle(len(files), seed=seed, reshuffle_each_iteration=True)
+    ds = ds.batch(batch_size)
+    ds = ds.map(
+        lambda images, labels: (
+            tf.cast(images, tf.float32) / 255.0,
+            tf.one_hot(labels, num_classes),
+        ),
+        num_parallel_calls=AUTOTUNE,
+    )
+    return ds.prefetch(AUTOTUNE)
+
+
+class ThroughputLogger(tf.keras.callbacks.Callback):
+    def __init__(self, num_images):
+        super().__init__()
+        self.num_images = num_images
+        self.epochs = []
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self.start = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        elapsed = time.perf_counter() - self.start
+        self.epochs.append(
+            {
+                "epoch": epoch + 1,
+                "seconds": elapsed,
+                "images_per_sec": self.num_images / elapsed,
+            }
+        )
+        print(
+            f"Época {epoch + 1}: {elapsed:.1f}s, "
+            f"{self.num_images / elapsed:.1f} imagens/s de treino"
+        )
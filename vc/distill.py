@@ -0,0 +1,243 @@
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras import layers, models
+from tensorflow.keras.applications import MobileNetV2, MobileNetV3Small
+
+from backends import input_size
+from dataset import AUTOTUNE, decode, split_files
+from preprocessing import load_image
+from serving import InferenceEngine, measure_latency
+
+STUDENTS = {
+    "mobilenetv2_a050_224": (MobileNetV2, {"alpha": 0.5}, 224),
+    "mobilenetv2_a050_160": (MobileNetV2, {"alpha": 0.5}, 160),
+    "mobilenetv2_a035_128": (MobileNetV2, {"alpha": 0.35}, 128),
+    "mobilenetv3small_224": (
+        MobileNetV3Small,
+        {"include_preprocessing": False},
+        224,
+    ),
+    "mobilenetv3small_160": (
+        MobileNetV3Small,
+        {"include_preprocessing": False},
+        160,
+    ),
+}
+
+
+def build_student(name, num_classes, weights="imagenet"):
+    application, kwargs, resolution = STUDENTS[name]
+    base = application(
+        input_shape=(resolution, resolution, 3),
+        include_top=False,
+        weights=weights,
+        **kwargs,
+    )
+    base.trainable = False
+
+    # O app entrega pixels em [0, 1]; as MobileNets esperam [-1, 1].
+    inputs = layers.Input((resolution, resolution, 3))
+    x = layers.Rescaling(2.0, offset=-1.0)(inputs)
+    x = base(x, training=False)
+    x = layers.GlobalAveragePooling2D()(x)
+    x = layers.Dropout(0.2)(x)
+    outputs = layers.Dense(num_classes, activation="softmax")(x)
+    return models.Model(inputs, outputs, name=name), base
+
+
+def teacher_predictions(teacher, files, batch_size=32):
+    height, width = teacher.input_shape[1:3]
+    ds = (
+        tf.data.Dataset.from_tensor_slices(files)
+        .map(
+            lambda path: tf.cast(decode(path, (height, width)), tf.float32) / 255.0,
+            num_parallel_calls=AUTOTUNE,
+        )
+        .batch(batch_size)
+        .prefetch(AUTOTUNE)
+    )
+    return teacher.predict(ds, verbose=0)
+
+
+def soften(probs, temperature):
+    logits = np.log(np.clip(probs, 1e-7, 1.0)) / temperature
+    logits -= logits.max(axis=1, keepdims=True)
+    soft = np.exp(logits)
+    return (soft / soft.sum(axis=1, keepdims=True)).astype(np.float32)
+
+
+def distillation_loss(num_classes, temperature, alpha):
+    def loss(y_true, y_pred):
+        hard, soft = y_true[:, :num_classes], y_true[:, num_classes:]
+        student = tf.nn.softmax(
+            tf.math.log(tf.clip_by_value(y_pred, 1e-7, 1.0)) / temperature
+        )
+        return alpha * tf.keras.losses.categorical_crossentropy(hard, y_pred) + (
+            1 - alpha
+        ) * temperature**2 * tf.keras.losses.KLDivergence(reduction=None)(
+            soft, student
+        )
+
+    return loss
+
+
+def hard_accuracy(num_classes):
+    def accuracy(y_true, y_pred):
+        return tf.keras.metrics.categorical_accuracy(y_true[:, :num_classes], y_pred)
+
+    return accuracy
+
+
+def student_dataset(files, targets, resolution, batch_size, training):
+    ds = tf.data.Dataset.from_tensor_slices((files, targets))
+    ds = ds.map(
+        lambda path, target: (decode(path, (resolution, resolution)), target),
+        num_parallel_calls=AUTOTUNE,
+    ).cache()
+    if training:
+        ds = ds.shuffle(len(files), seed=42, reshuffle_each_iteration=True)
+    ds = ds.batch(batch_size).map(
+        lambda images, target: (tf.cast(images, tf.float32) / 255.0, target),
+        num_parallel_calls=AUTOTUNE,
+    )
+    return ds.prefetch(AUTOTUNE)
+
+
+def train_student(name, train_data, val_data, num_classes, args):
+    student, base = build_student(name, num_classes, weights=args.weights)
+    resolution = STUDENTS[name][2]
+    train_ds = student_dataset(*train_data, resolution, args.batch_size, True)
+    val_ds = student_dataset(*val_data, resolution, args.batch_size, False)
+    loss = distillation_loss(num_classes, args.temperature, args.alpha)
+    metrics = [hard_accuracy(num_classes)]
+
+    start = time.perf_counter()
+    student.compile(
+        optimizer=tf.keras.optimizers.Adam(1e-3), loss=loss, metrics=metrics
+    )
+    student.fit(train_ds, validation_data=val_ds, epochs=args.epochs, verbose=2)
+    if args.finetune_epochs:
+        base.trainable = True
+        student.compile(
+            optimizer=tf.keras.optimizers.Adam(1e-5), loss=loss, metrics=metrics
+        )
+        student.fit(
+            train_ds, validation_data=val_ds, epochs=args.finetune_epochs, verbose=2
+        )
+    train_s = time.perf_counter() - start
+
+    # Salva uma cópia sem compile: o app carrega o .keras sem custom_objects.
+    exported = models.Model.from_config(student.get_config())
+    exported.set_weights(student.get_weights())
+    path = Path(args.out) / f"{name}.keras"
+    exported.save(path)
+    return str(path), train_s
+
+
+def evaluate(path, val_files, val_labels, teacher_preds=None):
+    model = tf.keras.models.load_model(path)
+    engine = InferenceEngine(model, path=path)
+    engine.warmup((1, 16))
+    images = np.stack([load_image(file, size=engine.input_size) for file in val_files])
+    preds = np.concatenate(
+        [engine(images[i : i + 16]) for i in range(0, len(images), 16)]
+    )
+    result = {
+        "path": path,
+        "input_size": list(engine.input_size),
+        "params": int(model.count_params()),
+        "size_mb": round(os.path.getsize(path) / 1e6, 2),
+        "accuracy": float(np.mean(preds.argmax(axis=1) == val_labels)),
+        "latency": measure_latency(engine, engine.input_shape),
+    }
+    if teacher_preds is not None:
+        result["agreement"] = float(
+            np.mean(preds.argmax(axis=1) == teacher_preds.argmax(axis=1))
+        )
+    return result, preds
+
+
+def distill(args):
+    Path(args.out).mkdir(parents=True, exist_ok=True)
+    class_names, (train_files, train_labels), (val_files, val_labels) = split_files(
+        args.data, validation_split=0.2
+    )
+    num_classes = len(class_names)
+    val_labels = np.asarray(val_labels)
+    eye = np.eye(num_classes, dtype=np.float32)
+
+    teacher = tf.keras.models.load_model(args.teacher)
+    print(f"Professor {args.teacher}: entrada {input_size(args.teacher)}")
+    soft_train = soften(teacher_predictions(teacher, train_files), args.temperature)
+    soft_val = soften(teacher_predictions(teacher, val_files), args.temperature)
+    train_data = (train_files, np.concatenate([eye[train_labels], soft_train], axis=1))
+    val_data = (val_files, np.concatenate([eye[val_labels], soft_val], axis=1))
+
+    report = {"teacher": None, "students": {}}
+    report["teacher"], teacher_preds = evaluate(args.teacher, val_files, val_labels)
+    for name in args.students:
+        print(f"\nDestilando {name}")
+        path, train_s = train_student(name, train_data, val_data, num_classes, args)
+        result, _ = evaluate(path, val_files, val_labels, teacher_preds)
+        result["train_s"] = train_s
+        report["students"][name] = result
+
+    report["config"] = {
+        "temperature": args.temperature,
+        "alpha": args.alpha,
+        "epochs": args.epochs,
+        "finetune_epochs": args.finetune_epochs,
+        "batch_size": args.batch_size,
+        "train_images": len(train_files),
+        "val_images": len(val_files),
+        "cpu_count": os.cpu_count(),
+    }
+    with open(Path(args.out) / "distill_report.json", "w") as f:
+        json.dump(report, f, indent=2)
+
+    teacher_p50 = report["teacher"]["latency"]["p50_ms"]
+    print(
+        f"\n{'modelo':22s} {'entrada':>9s} {'params':>9s} {'MB':>6s} "
+        f"{'acc':>6s} {'concord.':>8s} {'p50 ms':>7s} {'ganho':>6s}"
+    )
+    rows = [("professor", report["teacher"])] + list(report["students"].items())
+    for name, row in rows:
+        p50 = row["latency"]["p50_ms"]
+        print(
+            f"{name:22s} {'x'.join(map(str, row['input_size'])):>9s} "
+            f"{row['params']:>9d} {row['size_mb']:>6.2f} {row['accuracy']:>6.3f} "
+            f"{row.get('agreement', 1.0):>8.3f} {p50:>7.1f} {teacher_p50 / p50:>5.1f}x"
+        )
+    print(
+        f"\nRelatório salvo em {Path(args.out) / 'distill_report.json'}. "
+        f"Para servir um aluno: VC_MODEL_PATH={Path(args.out)}/<aluno>.keras"
+    )
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Destila model.keras em modelos menores para CPU"
+    )
+    parser.add_argument("--teacher", default=os.getenv("VC_MODEL_PATH", "model.keras"))
+    parser.add_argument("--data", default="data/")
+    parser.add_argument("--out", default="students/")
+    parser.add_argument(
+        "--students", nargs="+", default=list(STUDENTS), choices=list(STUDENTS)
+    )
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--finetune-epochs", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--temperature", type=float, default=4.0)
+    parser.add_argument("--alpha", type=float, default=0.3)
+    parser.add_argument("--weights", default="imagenet", help="'none' sem pré-treino")
+    args = parser.parse_args()
+    if args.weights == "none":
+        args.weights = None
+    distill(args)
@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import tensorflow as tf
+
+from dataset import AUTOTUNE, decode
+
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+class FeatureStore:
+    def __init__(self, directory, signature):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.features_path = self.directory / "features.npy"
+        self.index_path = self.directory / "index.json"
+        self.signature = signature
+
+        self.index = {}
+        self.features = None
+        if self.index_path.exists() and self.features_path.exists():
+            saved = json.loads(self.index_path.read_text())
+            if saved.get("signature") == signature:
+                self.index = saved["files"]
+                self.features = np.load(self.features_path, mmap_mode="r+")
+
+    def _grow(self, rows, dim):
+        current = 0 if self.features is None else len(self.features)
+        tmp_path = self.directory / "features.tmp.npy"
+        grown = np.lib.format.open_memmap(
+            tmp_path, mode="w+", dtype=np.float32, shape=(current + rows, dim)
+        )
+        if current:
+            grown[:current] = self.features
+        grown.flush()
+        del grown
+        self.features = None
+        os.replace(tmp_path, self.features_path)
+        self.features = np.load(self.features_path, mmap_mode="r+")
+        return current
+
+    def _save_index(self):
+        tmp_path = self.index_path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps({"signature": self.signature, "files": self.index})
+        )
+        os.replace(tmp_path, self.index_path)
+
+    def embed(self, files, extractor, img_size=(224, 224), batch_size=64):
+        hashes = {path: file_hash(path) for path in files}
+        stale = [
+            path
+            for path in files
+            if path not in self.index or self.index[path][1] != hashes[path]
+        ]
+
+        if stale:
+            start = time.perf_counter()
+            ds = (
+                tf.data.Dataset.from_tensor_slices(stale)
+                .map(
+                    lambda path: tf.cast(decode(path, img_size), tf.float32) / 255.0,
+                    num_parallel_calls=AUTOTUNE,
+                )
+                .batch(batch_size)
+                .prefetch(AUTOTUNE)
+            )
+            new = [path for path in stale if path not in self.index]
+            dim = extractor.output_shape[-1]
+            next_row = self._grow(len(new), dim) if new else None
+            for path in new:
+                self.index[path] = [next_row, None]
+                next_row += 1
+
+            offset = 0
+            for images in ds:
+                embeddings = extractor(images, training=False).numpy()
+                for path, embedding in zip(
+                    stale[offset : offset + len(embeddings)], embeddings
+                ):
+                    self.features[self.index[path][0]] = embedding
+                    self.index[path][1] = hashes[path]
+                offset += len(embeddings)
+
+            self.features.flush()
+            self._save_index()
+            elapsed = time.perf_counter() - start
+            print(
+                f"Embeddings: {len(stale)} calculados em {elapsed:.1f}s "
+                f"({len(stale) / elapsed:.1f} imagens/s), "
+                f"{len(files) - len(stale)} reaproveitados do cache"
+            )
+        else:
+            print(f"Embeddings: {len(files)} reaproveitados do cache")
+
+        rows = [self.index[path][0] for path in files]
+        return np.asarray(self.features[rows], dtype=np.float32)
@@ -0,0 +1,103 @@
+import json
+import os
+import random
+
+import numpy as np
+import tensorflow as tf
+
+from backends import TFLITE_VARIANTS, tflite_path
+from preprocessing import IMG_SIZE, load_image
+from serving import InferenceEngine, TFLiteEngine, measure_latency
+
+
+def representative_dataset(files, samples=200, seed=42, size=IMG_SIZE):
+    files = list(files)
+    random.Random(seed).shuffle(files)
+
+    def generator():
+        for path in files[:samples]:
+            yield [np.expand_dims(load_image(path, size=size), axis=0)]
+
+    return generator
+
+
+def convert(model, variant, calibration_files=None, calibration_samples=200):
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if variant == "dynamic":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    elif variant == "int8":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        height, width = model.input_shape[1:3]
+        converter.representative_dataset = representative_dataset(
+            calibration_files, calibration_samples, size=(width, height)
+        )
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+    return converter.convert()
+
+
+def predict_all(predict_fn, images, batch_size=16):
+    preds = [
+        predict_fn(images[i : i + batch_size])
+        for i in range(0, len(images), batch_size)
+    ]
+    return np.concatenate(preds)
+
+
+def export_tflite(
+    model,
+    calibration_files,
+    eval_files,
+    eval_labels,
+    model_path="model.keras",
+    report_path="export_report.json",
+    calibration_samples=200,
+):
+    keras_engine = InferenceEngine(model)
+    images = np.stack(
+        [load_image(path, size=keras_engine.input_size) for path in eval_files]
+    )
+    eval_labels = np.asarray(eval_labels)
+
+    keras_preds = predict_all(keras_engine, images)
+    keras_acc = float(np.mean(keras_preds.argmax(axis=1) == eval_labels))
+    report = {
+        "eval_images": len(eval_files),
+        "calibration_images": min(len(calibration_files), calibration_samples),
+        "keras": {
+            "accuracy": keras_acc,
+            "latency": measure_latency(keras_engine, keras_engine.input_shape),
+        },
+    }
+
+    for variant in TFLITE_VARIANTS:
+        path = tflite_path(model_path, variant)
+        with open(path, "wb") as f:
+            f.write(convert(model, variant, calibration_files, calibration_samples))
+
+        engine = TFLiteEngine(path)
+        preds = predict_all(engine, images)
+        acc = float(np.mean(preds.argmax(axis=1) == eval_labels))
+        report[f"tflite-{variant}"] = {
+            "path": path,
+            "size_mb": round(os.path.getsize(path) / 1e6, 2),
+            "accuracy": acc,
+            "accuracy_delta": acc - keras_acc,
+            "agreement": float(
+                np.mean(preds.argmax(axis=1) == keras_preds.argmax(axis=1))
+            ),
+            "latency": measure_latency(engine, engine.input_shape),
+        }
+
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print("\nExportação TFLite:")
+    for name, result in report.items():
+        if isinstance(result, dict):
+            print(
+                f"  {name:16s} acc={result['accuracy']:.4f} "
+                f"p50={result['latency']['p50_ms']:.1f}ms"
+            )
+    return report
@@ -0,0 +1,70 @@
+import threading
+import time
+
+
+class ModelLoader:
+    def __init__(self, path, backend="keras", **engine_kwargs):
+        self.path = path
+        self.backend = backend
+        self.engine_kwargs = engine_kwargs
+
+        self.engine = None
+        self.error = None
+        self.phases = {}
+        self.started_at = None
+        self.ready = threading.Event()
+        self.thread = threading.Thread(target=self._load, daemon=True)
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self.thread.start()
+        return self
+
+    def _load(self):
+        try:
+            start = time.perf_counter()
+            import tensorflow  # noqa: F401
+            from serving import load_engine
+
+            self.phases["tf_import_s"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            engine = load_engine(self.path, backend=self.backend, **self.engine_kwargs)
+            total = time.perf_counter() - start
+            self.phases["model_load_s"] = total - engine.warmup_s
+            self.phases["warmup_s"] = engine.warmup_s
+            self.phases["total_s"] = time.perf_counter() - self.started_at
+            self.engine = engine
+            print(
+                "Modelo pronto: "
+                + ", ".join(
+                    f"{name}={value:.2f}" for name, value in self.phases.items()
+                )
+            )
+        except Exception as exc:
+            self.error = exc
+            print(f"Falha ao carregar o modelo: {exc!r}")
+        finally:
+            self.ready.set()
+
+    def wait(self, timeout=None):
+        if not self.ready.wait(timeout):
+            raise TimeoutError("Modelo ainda está carregando")
+        if self.error is not None:
+            raise RuntimeError(f"Modelo indisponível: {self.error}")
+        return self.engine
+
+    def status(self):
+        if not self.ready.is_set():
+            state = "loading"
+        elif self.error is not None:
+            state = "failed"
+        else:
+            state = "ready"
+        return {
+            "status": state,
+            "backend": self.backend,
+            "model": self.path,
+            "phases": {name: round(value, 3) for name, value in self.phases.items()},
+            "error": None if self.error is None else str(self.error),
+        }
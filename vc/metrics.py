@@ -0,0 +1,115 @@
+import json
+import threading
+from collections import defaultdict
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STAGES = ("decode", "resize", "normalize", "cache", "queue", "inference")
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+    def render(self, name, labels=""):
+        sep = "," if labels else ""
+        lines = [
+            f'{name}_bucket{{{labels}{sep}le="{bound}"}} {count}'
+            for bound, count in zip(self.buckets, self.counts)
+        ]
+        lines.append(f'{name}_bucket{{{labels}{sep}le="+Inf"}} {self.count}')
+        suffix = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{suffix} {self.sum}")
+        lines.append(f"{name}_count{suffix} {self.count}")
+        return lines
+
+
+class Metrics:
+    def __init__(self, namespace="vc", slow_request_ms=None):
+        self.namespace = namespace
+        self.slow_request_ms = slow_request_ms
+        self.lock = threading.Lock()
+        self.stages = {stage: Histogram() for stage in STAGES}
+        self.request_seconds = Histogram()
+        self.requests = 0
+        self.errors = 0
+        self.classes = defaultdict(int)
+        self.gauges = []
+
+    def gauge(self, name, help_text, fn, kind="gauge"):
+        self.gauges.append((name, help_text, fn, kind))
+
+    def observe(self, stages, total, label=None, error=False):
+        with self.lock:
+            self.requests += 1
+            if error:
+                self.errors += 1
+            if label is not None:
+                self.classes[label] += 1
+            self.request_seconds.observe(total)
+            for stage, seconds in stages.items():
+                if stage in self.stages:
+                    self.stages[stage].observe(seconds)
+
+        if self.slow_request_ms is not None and total * 1000 >= self.slow_request_ms:
+            print(
+                "[slow] "
+                + json.dumps(
+                    {
+                        "total_ms": round(total * 1000, 2),
+                        "classe": label,
+                        "erro": error,
+                        "stages_ms": {
+                            stage: round(seconds * 1000, 2)
+                            for stage, seconds in stages.items()
+                        },
+                    }
+                )
+            )
+
+    def render(self):
+        ns = self.namespace
+        lines = []
+        with self.lock:
+            lines += [
+                f"# HELP {ns}_requests_total Requisições de classificação.",
+                f"# TYPE {ns}_requests_total counter",
+                f"{ns}_requests_total {self.requests}",
+                f"# HELP {ns}_errors_total Requisições que falharam.",
+                f"# TYPE {ns}_errors_total counter",
+                f"{ns}_errors_total {self.errors}",
+                f"# HELP {ns}_predictions_total Predições por classe.",
+                f"# TYPE {ns}_predictions_total counter",
+            ]
+            lines += [
+                f'{ns}_predictions_total{{classe="{label}"}} {count}'
+                for label, count in sorted(self.classes.items())
+            ]
+            lines += [
+                f"# HELP {ns}_request_seconds Tempo total de classify().",
+                f"# TYPE {ns}_request_seconds histogram",
+            ]
+            lines += self.request_seconds.render(f"{ns}_request_seconds")
+            lines += [
+                f"# HELP {ns}_stage_seconds Tempo por etapa de classify().",
+                f"# TYPE {ns}_stage_seconds histogram",
+            ]
+            for stage, histogram in self.stages.items():
+                lines += histogram.render(f"{ns}_stage_seconds", f'stage="{stage}"')
+
+        for name, help_text, fn, kind in self.gauges:
+            lines += [
+                f"# HELP {ns}_{name} {help_text}",
+                f"# TYPE {ns}_{name} {kind}",
+                f"{ns}_{name} {float(fn())}",
+            ]
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,124 @@
+import io
+import time
+import tracemalloc
+
+import numpy as np
+from PIL import Image, ImageOps
+
+IMG_SIZE = (224, 224)
+SCALE = np.float32(1 / 255)
+EXIF_ORIENTATION = 0x0112
+
+
+def open_image(source, size=IMG_SIZE):
+    if isinstance(source, Image.Image):
+        image = source
+    elif isinstance(source, (bytes, bytearray)):
+        image = Image.open(io.BytesIO(source))
+    else:
+        image = Image.open(source)
+
+    if image.format == "JPEG":
+        image.draft("RGB", size)
+    return image
+
+
+def to_rgb(image):
+    if image.getexif().get(EXIF_ORIENTATION, 1) != 1:
+        image = ImageOps.exif_transpose(image)
+    if image.mode == "P":
+        image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+    if image.mode in ("RGBA", "LA", "PA"):
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    if image.mode != "RGB":
+        return image.convert("RGB")
+    return image
+
+
+def to_float32(image, out=None):
+    pixels = np.asarray(image, dtype=np.uint8)
+    if out is None:
+        out = np.empty(pixels.shape, dtype=np.float32)
+    np.multiply(pixels, SCALE, out=out)
+    return out
+
+
+def load_image(source, size=IMG_SIZE, out=None, timings=None):
+    start = time.perf_counter()
+    image = to_rgb(open_image(source, size))
+    image.load()
+    decoded = time.perf_counter()
+    if image.size != size:
+        image = image.resize(size, Image.BICUBIC, reducing_gap=3.0)
+    resized = time.perf_counter()
+    out = to_float32(image, out)
+    if timings is not None:
+        timings["decode"] = decoded - start
+        timings["resize"] = resized - decoded
+        timings["normalize"] = time.perf_counter() - resized
+    return out
+
+
+class BatchBuffer:
+    def __init__(self, capacity, size=IMG_SIZE):
+        self.array = np.empty((capacity, size[1], size[0], 3), dtype=np.float32)
+
+    def __len__(self):
+        return len(self.array)
+
+    def __getitem__(self, index):
+        return self.array[index]
+
+    def stack(self, images):
+        return np.stack(images, out=self.array[: len(images)])
+
+
+def legacy_load_image(data, size=IMG_SIZE):
+    image = Image.open(io.BytesIO(data)).resize(size)
+    return np.array(image) / 255.0
+
+
+def benchmark(width=4000, height=3000, runs=10):
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 255, (height // 8, width // 8, 3), dtype=np.uint8)
+    photo = Image.fromarray(pixels).resize((width, height))
+    buffer = io.BytesIO()
+    photo.save(buffer, format="JPEG", quality=90)
+    data = buffer.getvalue()
+
+    out = np.empty((IMG_SIZE[1], IMG_SIZE[0], 3), dtype=np.float32)
+    paths = {
+        "legacy": lambda: legacy_load_image(data),
+        "draft+float32": lambda: load_image(data),
+        "draft+float32+buffer": lambda: load_image(data, out=out),
+    }
+
+    results = {}
+    for name, fn in paths.items():
+        fn()
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            result = fn()
+            times.append((time.perf_counter() - start) * 1000)
+
+        tracemalloc.start()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        results[name] = {
+            "mean_ms": round(float(np.mean(times)), 2),
+            "p50_ms": round(float(np.percentile(times, 50)), 2),
+            "numpy_peak_kb": round(peak / 1024, 1),
+            "dtype": str(result.dtype),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    print(f"Pré-processamento de uma foto JPEG 4000x3000 para {IMG_SIZE}:")
+    for name, result in benchmark().items():
+        print(f"  {name:22s} {result}")
@@ -0,0 +1,159 @@
+import json
+import os
+import platform
+import resource
+import time
+
+import numpy as np
+import tensorflow as tf
+
+
+def summarize(values):
+    if not values:
+        return {}
+    return {
+        "mean_ms": float(np.mean(values) * 1000),
+        "p50_ms": float(np.percentile(values, 50) * 1000),
+        "p95_ms": float(np.percentile(values, 95) * 1000),
+        "total_s": float(np.sum(values)),
+    }
+
+
+class StepTimer(tf.keras.callbacks.Callback):
+    # No Keras 3 o get_next() do dataset roda dentro do train_function: o
+    # tempo de entrada cai dentro do passo, e não entre um passo e outro.
+    def __init__(self):
+        super().__init__()
+        self.steps = []
+
+    def on_train_batch_begin(self, batch, logs=None):
+        self.begin = time.perf_counter()
+
+    def on_train_batch_end(self, batch, logs=None):
+        self.steps.append(time.perf_counter() - self.begin)
+
+    def summary(self, input_times=()):
+        steps = self.steps[1:]
+        fraction = None
+        if input_times and steps:
+            # Perto de 1: o pipeline sozinho já leva o passo inteiro, então é
+            # ele que limita o treino.
+            fraction = min(1.0, float(np.mean(input_times) / np.mean(steps)))
+        return {
+            "input_pipeline": summarize(list(input_times)),
+            "train_step": summarize(steps),
+            "input_bound_fraction": fraction,
+        }
+
+
+def time_input(dataset, batches=20):
+    # Lê o pipeline tf.data sozinho, sem modelo, lote a lote. O primeiro lote
+    # paga o aquecimento e fica de fora.
+    times = []
+    start = time.perf_counter()
+    for _ in dataset.take(batches + 1):
+        end = time.perf_counter()
+        times.append(end - start)
+        start = end
+    return times[1:]
+
+
+class ProfilerWindow(tf.keras.callbacks.Callback):
+    def __init__(self, log_dir, start_step=2, stop_step=6):
+        super().__init__()
+        self.log_dir = log_dir
+        self.start_step = start_step
+        self.stop_step = stop_step
+        self.step = 0
+        self.active = False
+
+    def on_train_batch_begin(self, batch, logs=None):
+        self.step += 1
+        if self.step == self.start_step:
+            tf.profiler.experimental.start(self.log_dir)
+            self.active = True
+
+    def on_train_batch_end(self, batch, logs=None):
+        if self.active and self.step == self.stop_step:
+            self._stop()
+
+    def on_train_end(self, logs=None):
+        if self.active:
+            self._stop()
+
+    def _stop(self):
+        tf.profiler.experimental.stop()
+        self.active = False
+        print(f"Trace do profiler salvo em {self.log_dir}")
+
+
+def component_breakdown(base, head, batch_size, img_size, runs=10):
+    head = tf.keras.models.clone_model(head)
+    head.compile(optimizer="adam", loss="categorical_crossentropy")
+    images = tf.random.uniform((batch_size, *img_size, 3))
+    features = tf.random.uniform((batch_size, base.output_shape[-1]))
+    labels = tf.one_hot(tf.zeros(batch_size, tf.int32), head.output_shape[-1])
+
+    backbone = tf.function(lambda x: tf.reduce_mean(base(x, training=False), [1, 2]))
+    backbone(images)
+    head.train_on_batch(features, labels)
+
+    backbone_times, head_times = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        backbone(images).numpy()
+        backbone_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        head.train_on_batch(features, labels)
+        head_times.append(time.perf_counter() - start)
+    return {
+        "backbone_forward": summarize(backbone_times),
+        "head_update": summarize(head_times),
+    }
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def write_report(
+    path, history, throughput, step_timer, config, breakdown=None, input_times=()
+):
+    epochs = throughput.epochs
+    val_accuracy = history.history.get("val_accuracy", [None])[-1]
+    report = {
+        "config": config,
+        "environment": {
+            "python": platform.python_version(),
+            "tensorflow": tf.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+        },
+        "epochs": epochs,
+        "images_per_sec": (
+            float(np.mean([e["images_per_sec"] for e in epochs[1:]]))
+            if len(epochs) > 1
+            else epochs[0]["images_per_sec"]
+        ),
+        "first_epoch_s": epochs[0]["seconds"],
+        "epoch_wall_s": float(np.mean([e["seconds"] for e in epochs])),
+        "total_train_s": float(sum(e["seconds"] for e in epochs)),
+        "peak_rss_mb": peak_rss_mb(),
+        "final_val_accuracy": None if val_accuracy is None else float(val_accuracy),
+    }
+    if step_timer is not None:
+        report["steps"] = step_timer.summary(input_times)
+    if breakdown is not None:
+        report["components"] = breakdown
+
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(
+        f"\nRelatório de treino salvo em {path}: "
+        f"{report['images_per_sec']:.1f} imagens/s, "
+        f"{report['epoch_wall_s']:.1f}s por época, "
+        f"pico de memória {report['peak_rss_mb']:.0f}MB, "
+        f"val_accuracy={report['final_val_accuracy']}"
+    )
+    return report
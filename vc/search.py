@@ -0,0 +1,270 @@
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras import layers, models
+
+SPACE = {
+    "units": [64, 128, 256],
+    "learning_rate": [1e-4, 3e-4, 1e-3, 3e-3],
+    "dropout": [0.0, 0.2, 0.5],
+    "batch_size": [16, 32, 64],
+}
+
+
+def sample_configs(trials, seed=42):
+    grid = [dict(zip(SPACE, values)) for values in itertools.product(*SPACE.values())]
+    random.Random(seed).shuffle(grid)
+    return grid[:trials]
+
+
+def build_head(features_dim, num_classes, units, dropout):
+    return models.Sequential(
+        [
+            layers.Input((features_dim,)),
+            layers.Dense(units, activation="relu"),
+            layers.Dropout(dropout),
+            layers.Dense(num_classes, activation="softmax"),
+        ]
+    )
+
+
+class MedianStopping(tf.keras.callbacks.Callback):
+    def __init__(self, history, trial_id, min_epochs=2, min_peers=2):
+        super().__init__()
+        self.history = history
+        self.trial_id = trial_id
+        self.min_epochs = min_epochs
+        self.min_peers = min_peers
+        self.pruned_at = None
+
+    def on_epoch_end(self, epoch, logs=None):
+        accuracy = logs["val_accuracy"]
+        self.history[(self.trial_id, epoch)] = accuracy
+        if epoch + 1 < self.min_epochs:
+            return
+        peers = [
+            value
+            for (trial_id, peer_epoch), value in self.history.items()
+            if peer_epoch == epoch and trial_id != self.trial_id
+        ]
+        if len(peers) >= self.min_peers and accuracy < statistics.median(peers):
+            self.pruned_at = epoch + 1
+            self.model.stop_training = True
+
+
+def init_worker():
+    tf.config.threading.set_intra_op_parallelism_threads(1)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def run_trial(trial_id, config, data_dir, out_dir, history, epochs, patience):
+    start = time.perf_counter()
+    data_dir = Path(data_dir)
+    x_train = np.load(data_dir / "x_train.npy", mmap_mode="r")
+    y_train = np.load(data_dir / "y_train.npy")
+    x_val = np.load(data_dir / "x_val.npy", mmap_mode="r")
+    y_val = np.load(data_dir / "y_val.npy")
+
+    tf.keras.utils.set_random_seed(trial_id)
+    head = build_head(
+        x_train.shape[1], y_train.shape[1], config["units"], config["dropout"]
+    )
+    head.compile(
+        optimizer=tf.keras.optimizers.Adam(config["learning_rate"]),
+        loss="categorical_crossentropy",
+        metrics=["accuracy"],
+    )
+    pruning = MedianStopping(history, trial_id)
+    fit = head.fit(
+        np.asarray(x_train),
+        y_train,
+        validation_data=(np.asarray(x_val), y_val),
+        batch_size=config["batch_size"],
+        epochs=epochs,
+        verbose=0,
+        callbacks=[
+            tf.keras.callbacks.EarlyStopping(
+                monitor="val_loss", patience=patience, restore_best_weights=True
+            ),
+            pruning,
+        ],
+    )
+
+    weights_path = Path(out_dir) / f"trial_{trial_id:03d}.weights.h5"
+    head.save_weights(weights_path)
+    val_accuracy = fit.history["val_accuracy"]
+    val_loss = fit.history["val_loss"]
+    best = int(np.argmin(val_loss))
+    return {
+        "trial": trial_id,
+        **config,
+        "val_accuracy": float(val_accuracy[best]),
+        "val_loss": float(val_loss[best]),
+        "epochs": len(val_loss),
+        "status": "podado" if pruning.pruned_at else "completo",
+        "seconds": time.perf_counter() - start,
+        "weights": str(weights_path),
+    }
+
+
+def prepare_data(train_dir, features_dir, data_dir, img_size):
+    from tensorflow.keras.applications import MobileNetV2
+
+    from dataset import split_files
+    from embeddings import FeatureStore
+
+    class_names, (train_files, train_labels), (val_files, val_labels) = split_files(
+        train_dir, validation_split=0.2
+    )
+    base = MobileNetV2(
+        input_shape=img_size + (3,), include_top=False, weights="imagenet"
+    )
+    base.trainable = False
+    extractor = models.Sequential([base, layers.GlobalAveragePooling2D()])
+    store = FeatureStore(
+        features_dir, signature=f"{base.name}:{img_size}:{base.output_shape[-1]}"
+    )
+
+    data_dir = Path(data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    np.save(data_dir / "x_train.npy", store.embed(train_files, extractor, img_size))
+    np.save(data_dir / "x_val.npy", store.embed(val_files, extractor, img_size))
+    np.save(
+        data_dir / "y_train.npy",
+        np.eye(len(class_names), dtype=np.float32)[train_labels],
+    )
+    np.save(
+        data_dir / "y_val.npy", np.eye(len(class_names), dtype=np.float32)[val_labels]
+    )
+    return base, class_names, (train_files, train_labels), (val_files, val_labels)
+
+
+def export_best(best, base, num_classes, model_path, calibration_files, eval_data):
+    from export_tflite import export_tflite
+
+    head = build_head(
+        base.output_shape[-1], num_classes, best["units"], best["dropout"]
+    )
+    head.load_weights(best["weights"])
+    model = models.Sequential([base, layers.GlobalAveragePooling2D(), *head.layers])
+    model.save(model_path, include_optimizer=False)
+    export_tflite(
+        model,
+        calibration_files=calibration_files,
+        eval_files=eval_data[0],
+        eval_labels=eval_data[1],
+        model_path=model_path,
+    )
+
+
+def search(args):
+    start = time.perf_counter()
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    img_size = (224, 224)
+
+    base, class_names, (train_files, _), val_data = prepare_data(
+        args.data, args.features, out_dir / "data", img_size
+    )
+    configs = sample_configs(args.trials, seed=args.seed)
+    print(
+        f"Busca: {len(configs)} trials em {args.workers} processos, "
+        f"{len(train_files)} imagens de treino"
+    )
+
+    results, failures = [], []
+    context = multiprocessing.get_context("spawn")
+    with context.Manager() as manager, ProcessPoolExecutor(
+        max_workers=args.workers, mp_context=context, initializer=init_worker
+    ) as pool:
+        history = manager.dict()
+        futures = {
+            pool.submit(
+                run_trial,
+                trial_id,
+                config,
+                str(out_dir / "data"),
+                str(out_dir),
+                history,
+                args.epochs,
+                args.patience,
+            ): (trial_id, config)
+            for trial_id, config in enumerate(configs)
+        }
+        for future in as_completed(futures):
+            trial_id, config = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                failures.append({"trial": trial_id, **config, "erro": str(e)})
+                print(f"trial {trial_id:3d} falhou: {e}")
+                continue
+            results.append(result)
+            print(
+                f"trial {trial_id:3d} {result['status']:9s} "
+                f"val_accuracy={result['val_accuracy']:.4f} "
+                f"val_loss={result['val_loss']:.4f} "
+                f"épocas={result['epochs']} {result['seconds']:.1f}s"
+            )
+
+    if not results:
+        raise RuntimeError("Nenhum trial terminou com sucesso")
+
+    leaderboard = sorted(results, key=lambda r: (-r["val_accuracy"], r["val_loss"]))
+    elapsed = time.perf_counter() - start
+    with open(out_dir / "leaderboard.json", "w") as f:
+        json.dump(
+            {
+                "trials": len(configs),
+                "workers": args.workers,
+                "seconds": elapsed,
+                "leaderboard": leaderboard,
+                "failures": failures,
+            },
+            f,
+            indent=2,
+        )
+
+    print("\nRank  val_acc  val_loss  units  lr      dropout  batch  status")
+    for rank, row in enumerate(leaderboard, 1):
+        print(
+            f"{rank:4d}  {row['val_accuracy']:.4f}   {row['val_loss']:.4f}    "
+            f"{row['units']:<5d}  {row['learning_rate']:<7g} {row['dropout']:<7g}  "
+            f"{row['batch_size']:<5d}  {row['status']}"
+        )
+    print(f"\nBusca concluída em {elapsed:.1f}s, leaderboard em {out_dir}")
+
+    if args.export:
+        best = leaderboard[0]
+        print(f"Exportando o melhor trial ({best['trial']}) para {args.export}")
+        export_best(best, base, len(class_names), args.export, train_files, val_data)
+    return leaderboard
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Busca de hiperparâmetros da cabeça do classificador"
+    )
+    parser.add_argument("--data", default="data/")
+    parser.add_argument("--features", default=os.getenv("TRAIN_FEATURES", "features/"))
+    parser.add_argument("--out", default="search/")
+    parser.add_argument("--trials", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--patience", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--export",
+        help="salva o melhor modelo neste caminho (ex.: model.keras, o servido pelo app)",
+    )
+    search(parser.parse_args())
@@ -0,0 +1,138 @@
+import os
+import threading
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from backends import BACKENDS, model_file
+from preprocessing import IMG_SIZE
+
+
+class InferenceEngine:
+    def __init__(self, model, jit_compile=False, path=None):
+        self.model = model
+        self.path = path
+        self.jit_compile = jit_compile
+        height, width = model.input_shape[1:3]
+        self.input_size = (width, height)
+        self.input_shape = (height, width, 3)
+        self._predict = tf.function(
+            lambda images: model(images, training=False),
+            input_signature=[tf.TensorSpec([None, *self.input_shape], tf.float32)],
+            jit_compile=jit_compile,
+        )
+
+    def __call__(self, batch):
+        batch = tf.convert_to_tensor(batch, dtype=tf.float32)
+        return self._predict(batch).numpy()
+
+    def warmup(self, batch_sizes=(1,)):
+        start = time.perf_counter()
+        for size in batch_sizes:
+            self(np.zeros((size, *self.input_shape), dtype=np.float32))
+        return time.perf_counter() - start
+
+
+class TFLiteEngine:
+    def __init__(self, path, num_threads=None):
+        self.path = path
+        self.interpreter = tf.lite.Interpreter(model_path=path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self.input = self.interpreter.get_input_details()[0]
+        self.output = self.interpreter.get_output_details()[0]
+        height, width = (int(dim) for dim in self.input["shape"][1:3])
+        self.input_size = (width, height)
+        self.input_shape = (height, width, 3)
+        self.batch_size = 1
+        self.lock = threading.Lock()
+
+    def __call__(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+        with self.lock:
+            if len(batch) != self.batch_size:
+                self.interpreter.resize_tensor_input(
+                    self.input["index"], [len(batch), *self.input_shape]
+                )
+                self.interpreter.allocate_tensors()
+                self.batch_size = len(batch)
+
+            if self.input["dtype"] != np.float32:
+                scale, zero_point = self.input["quantization"]
+                info = np.iinfo(self.input["dtype"])
+                batch = np.clip(
+                    np.round(batch / scale + zero_point), info.min, info.max
+                )
+                batch = batch.astype(self.input["dtype"])
+
+            self.interpreter.set_tensor(self.input["index"], batch)
+            self.interpreter.invoke()
+            preds = self.interpreter.get_tensor(self.output["index"])
+
+        if self.output["dtype"] != np.float32:
+            scale, zero_point = self.output["quantization"]
+            preds = (preds.astype(np.float32) - zero_point) * scale
+        return preds
+
+    def warmup(self, batch_sizes=(1,)):
+        start = time.perf_counter()
+        for size in batch_sizes:
+            self(np.zeros((size, *self.input_shape), dtype=np.float32))
+        return time.perf_counter() - start
+
+
+def load_engine(
+    path="model.keras",
+    backend="keras",
+    jit_compile=False,
+    warmup_batch_sizes=(1,),
+    threads=None,
+):
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend inválido: {backend} (opções: {BACKENDS})")
+
+    if backend == "keras":
+        if threads:
+            tf.config.threading.set_intra_op_parallelism_threads(threads)
+        model = tf.keras.models.load_model(path)
+        engine = InferenceEngine(model, jit_compile=jit_compile, path=path)
+    else:
+        engine = TFLiteEngine(model_file(path, backend), num_threads=threads)
+
+    engine.warmup_s = engine.warmup(warmup_batch_sizes)
+    print(
+        f"Backend {backend}: warm-up concluído em {engine.warmup_s:.2f}s "
+        f"(lotes {list(warmup_batch_sizes)})"
+    )
+    return engine
+
+
+def measure_latency(predict_fn, input_shape=(*IMG_SIZE[::-1], 3), runs=50, warmup=5):
+    image = np.random.rand(1, *input_shape).astype(np.float32)
+    for _ in range(warmup):
+        predict_fn(image)
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        predict_fn(image)
+        times.append((time.perf_counter() - start) * 1000)
+    return {
+        "mean_ms": float(np.mean(times)),
+        "p50_ms": float(np.percentile(times, 50)),
+        "p95_ms": float(np.percentile(times, 95)),
+    }
+
+
+if __name__ == "__main__":
+    model_path = os.getenv("VC_MODEL_PATH", "model.keras")
+    engine = load_engine(model_path, jit_compile=os.getenv("VC_XLA") == "1")
+
+    before = measure_latency(
+        lambda x: engine.model.predict(x, verbose=0), engine.input_shape
+    )
+    after = measure_latency(engine, engine.input_shape)
+
+    print("Latência de uma imagem (CPU):")
+    print(f"  model.predict : {before}")
+    print(f"  tf.function   : {after}")
+    print(f"  ganho p50     : {before['p50_ms'] / after['p50_ms']:.1f}x")
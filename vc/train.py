@@ -1,29 +1,50 @@
+import os
+
 import tensorflow as tf
-from tensorflow.keras.preprocessing.image import ImageDataGenerator
 from tensorflow.keras.applications import MobileNetV2
 from tensorflow.keras import layers, models
 
-train_dir = "data/"
+from dataset import ThroughputLogger, make_dataset, split_files
+from embeddings import FeatureStore
+from export_tflite import export_tflite
+from profiling import (
+    ProfilerWindow,
+    StepTimer,
+    component_breakdown,
+    time_input,
+    write_report,
+)
 
-datagen = ImageDataGenerator(validation_split=0.2, rescale=1 / 255)
+train_dir = "data/"
 
 img_size = (224, 224)
 batch_size = 16
+cache = os.getenv("TRAIN_CACHE", "memory")
+mode = os.getenv("TRAIN_MODE", "full")
+profile = os.getenv("TRAIN_PROFILE", "0") == "1"
+report_path = os.getenv("TRAIN_REPORT", "train_report.json")
+
+class_names, (train_files, train_labels), (val_files, val_labels) = split_files(
+    train_dir, validation_split=0.2
+)
 
-train_gen = datagen.flow_from_directory(
-    train_dir,
-    target_size=img_size,
+train_ds = make_dataset(
+    train_files,
+    train_labels,
+    len(class_names),
+    img_size=img_size,
     batch_size=batch_size,
-    class_mode="categorical",
-    subset="training",
+    training=True,
+    cache=cache,
 )
 
-val_gen = datagen.flow_from_directory(
-    train_dir,
-    target_size=img_size,
+val_ds = make_dataset(
+    val_files,
+    val_labels,
+    len(class_names),
+    img_size=img_size,
     batch_size=batch_size,
-    class_mode="categorical",
-    subset="validation",
+    cache=cache,
 )
 
 base = MobileNetV2(input_shape=img_size + (3,), include_top=False, weights="imagenet")
@@ -38,10 +59,89 @@ model = models.Sequential(
     ]
 )
 
-print("\nClasses detectadas:", train_gen.class_indices)
+print("\nClasses detectadas:", {name: i for i, name in enumerate(class_names)})
+print(f"Treino: {len(train_files)} imagens, validação: {len(val_files)} imagens")
 
-model.compile(optimizer="adam", loss="categorical_crossentropy", metrics=["accuracy"])
+throughput = ThroughputLogger(len(train_files))
+callbacks = [throughput]
+step_timer = None
+if profile:
+    step_timer = StepTimer()
+    callbacks += [
+        step_timer,
+        ProfilerWindow(os.getenv("TRAIN_PROFILE_DIR", "logs/profile")),
+    ]
+
+if mode == "embeddings":
+    extractor = models.Sequential(model.layers[:2])
+    head = models.Sequential(
+        [layers.Input((base.output_shape[-1],)), *model.layers[2:]]
+    )
+    store = FeatureStore(
+        os.getenv("TRAIN_FEATURES", "features/"),
+        signature=f"{base.name}:{img_size}:{base.output_shape[-1]}",
+    )
+    x_train = store.embed(train_files, extractor, img_size=img_size)
+    x_val = store.embed(val_files, extractor, img_size=img_size)
+    y_train = tf.one_hot(train_labels, len(class_names))
+    y_val = tf.one_hot(val_labels, len(class_names))
 
-history = model.fit(train_gen, validation_data=val_gen, epochs=5)
+    head.compile(
+        optimizer="adam", loss="categorical_crossentropy", metrics=["accuracy"]
+    )
+    history = head.fit(
+        x_train,
+        y_train,
+        validation_data=(x_val, y_val),
+        batch_size=batch_size,
+        epochs=5,
+        callbacks=callbacks,
+    )
+else:
+    model.compile(
+        optimizer="adam", loss="categorical_crossentropy", metrics=["accuracy"]
+    )
+    history = model.fit(
+        train_ds,
+        validation_data=val_ds,
+        epochs=5,
+        callbacks=callbacks,
+    )
 
 model.save("model.keras", include_optimizer=False)
+
+write_report(
+    report_path,
+    history,
+    throughput,
+    step_timer,
+    config={
+        "mode": mode,
+        "cache": cache,
+        "batch_size": batch_size,
+        "img_size": list(img_size),
+        "train_images": len(train_files),
+        "val_images": len(val_files),
+    },
+    breakdown=(
+        component_breakdown(
+            base,
+            models.Sequential(
+                [layers.Input((base.output_shape[-1],)), *model.layers[2:]]
+            ),
+            batch_size,
+            img_size,
+        )
+        if profile
+        else None
+    ),
+    # No modo embeddings a entrada são arrays já em memória.
+    input_times=time_input(train_ds) if profile and mode != "embeddings" else (),
+)
+
+export_tflite(
+    model,
+    calibration_files=train_files,
+    eval_files=val_files,
+    eval_labels=val_labels,
+)
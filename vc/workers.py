@@ -0,0 +1,337 @@
+import argparse
+import os
+import secrets
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing import resource_tracker
+from multiprocessing.connection import Client, Listener
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from backends import input_size
+
+NUM_CLASSES = 2
+
+
+def attach(name, shape, create=False):
+    size = int(np.prod(shape)) * 4
+    shm = SharedMemory(name=name, create=create, size=size if create else 0)
+    return shm, np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+
+
+class Worker:
+    def __init__(self, index, capacity, image_shape):
+        self.index = index
+        self.capacity = capacity
+        self.input, self.images = attach(None, (capacity, *image_shape), create=True)
+        self.output, self.preds = attach(None, (capacity, NUM_CLASSES), create=True)
+
+        self.process = None
+        self.conn = None
+        self.alive = False
+        self.busy = False
+        self.error = None
+        self.phases = {}
+        self.batches = 0
+        self.images_done = 0
+        self.latency_ms = None
+
+    def run(self, batch):
+        n = len(batch)
+        start = time.perf_counter()
+        self.images[:n] = batch
+        self.conn.send(n)
+        status, payload = self.conn.recv()
+        if status != "ok":
+            raise RuntimeError(f"Worker {self.index}: {payload}")
+        preds = self.preds[:n].copy()
+
+        elapsed = (time.perf_counter() - start) * 1000 / n
+        self.latency_ms = (
+            elapsed
+            if self.latency_ms is None
+            else 0.8 * self.latency_ms + 0.2 * elapsed
+        )
+        self.batches += 1
+        self.images_done += n
+        return preds
+
+    def close(self):
+        if self.conn is not None and self.alive:
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+        if self.process is not None:
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        for shm in (self.input, self.output):
+            shm.close()
+            shm.unlink()
+
+
+class WorkerPool:
+    def __init__(
+        self, path, backend="keras", workers=2, threads=None, max_batch_size=8
+    ):
+        self.path = path
+        self.backend = backend
+        self.threads = threads or max(1, (os.cpu_count() or 1) // workers)
+        self.max_batch_size = max_batch_size
+        self.input_size = input_size(path)
+        image_shape = (self.input_size[1], self.input_size[0], 3)
+        self.workers = [Worker(i, max_batch_size, image_shape) for i in range(workers)]
+
+        self.cond = threading.Condition()
+        self.ready = threading.Event()
+        self.error = None
+        self.started_at = None
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self.authkey = authkey = secrets.token_bytes(16)
+        self.listener = Listener(("127.0.0.1", 0), authkey=authkey)
+        host, port = self.listener.address
+
+        for worker in self.workers:
+            env = dict(
+                os.environ,
+                VC_WORKER_AUTHKEY=authkey.hex(),
+                OMP_NUM_THREADS=str(self.threads),
+            )
+            worker.process = subprocess.Popen(
+                [
+                    sys.executable,
+                    os.path.abspath(__file__),
+                    f"{host}:{port}",
+                    "--index",
+                    str(worker.index),
+                    "--model",
+                    self.path,
+                    "--backend",
+                    self.backend,
+                    "--threads",
+                    str(self.threads),
+                    "--capacity",
+                    str(worker.capacity),
+                    "--size",
+                    *map(str, self.input_size),
+                    "--input",
+                    worker.input.name,
+                    "--output",
+                    worker.output.name,
+                ],
+                env=env,
+            )
+
+        threading.Thread(target=self._accept, daemon=True).start()
+        threading.Thread(target=self._watch, daemon=True).start()
+        return self
+
+    def _watch(self):
+        while not self.ready.wait(0.5):
+            pending = [w for w in self.workers if w.conn is None]
+            exited = [w for w in pending if w.process.poll() is not None]
+            for worker in exited:
+                code = worker.process.returncode
+                worker.error = f"processo saiu com código {code} antes de conectar"
+            if pending and len(exited) == len(pending):
+                with Client(self.listener.address, authkey=self.authkey) as conn:
+                    conn.send(("abort", None, None))
+                return
+
+    def _accept(self):
+        for _ in self.workers:
+            try:
+                conn = self.listener.accept()
+                status, index, payload = conn.recv()
+            except (OSError, EOFError):
+                break
+            if status == "abort":
+                break
+            worker = self.workers[index]
+            worker.conn = conn
+            if status == "ready":
+                worker.phases = payload
+                worker.phases["total_s"] = time.perf_counter() - self.started_at
+                with self.cond:
+                    worker.alive = True
+                    self.cond.notify_all()
+            else:
+                worker.error = payload
+                print(f"Worker {index} falhou: {payload}")
+        self.listener.close()
+
+        if not any(worker.alive for worker in self.workers):
+            self.error = RuntimeError("Nenhum worker disponível")
+        self.ready.set()
+
+    def wait(self, timeout=None):
+        if not self.ready.wait(timeout):
+            raise TimeoutError("Workers ainda estão carregando")
+        if self.error is not None:
+            raise RuntimeError(f"Modelo indisponível: {self.error}")
+        return self
+
+    def status(self):
+        if not self.ready.is_set():
+            state = "loading"
+        elif self.error is not None:
+            state = "failed"
+        else:
+            state = "ready"
+        return {
+            "status": state,
+            "backend": self.backend,
+            "model": self.path,
+            "threads_per_worker": self.threads,
+            "workers": [
+                {
+                    "index": worker.index,
+                    "alive": worker.alive,
+                    "busy": worker.busy,
+                    "batches": worker.batches,
+                    "images": worker.images_done,
+                    "latency_ms": worker.latency_ms,
+                    "phases": {
+                        name: round(value, 3) for name, value in worker.phases.items()
+                    },
+                    "error": worker.error,
+                }
+                for worker in self.workers
+            ],
+            "error": None if self.error is None else str(self.error),
+        }
+
+    def _acquire(self):
+        with self.cond:
+            while True:
+                idle = [w for w in self.workers if w.alive and not w.busy]
+                if idle:
+                    worker = min(idle, key=lambda w: (w.latency_ms or 0, w.batches))
+                    worker.busy = True
+                    return worker
+                if self.ready.is_set() and not any(w.alive for w in self.workers):
+                    raise RuntimeError("Nenhum worker disponível")
+                self.cond.wait()
+
+    def _release(self, worker, failed=False):
+        with self.cond:
+            worker.busy = False
+            if failed:
+                worker.alive = False
+            self.cond.notify_all()
+
+    def __call__(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+        preds = []
+        for start in range(0, len(batch), self.max_batch_size):
+            preds.append(self._run(batch[start : start + self.max_batch_size]))
+        return np.concatenate(preds)
+
+    def _run(self, chunk, attempts=2):
+        # Um worker que caiu sai do pool e o lote vai uma vez para outro vivo;
+        # o _acquire já falha se não sobrou nenhum.
+        for attempt in range(1, attempts + 1):
+            worker = self._acquire()
+            try:
+                preds = worker.run(chunk)
+            except (OSError, EOFError) as exc:
+                worker.error = f"caiu: {exc!r}"
+                self._release(worker, failed=True)
+                if attempt == attempts:
+                    raise RuntimeError(f"Worker {worker.index} caiu: {exc!r}")
+                print(f"Worker {worker.index} caiu, lote reenviado: {exc!r}")
+                continue
+            except Exception:
+                self._release(worker)
+                raise
+            self._release(worker)
+            return preds
+
+    def close(self):
+        for worker in self.workers:
+            worker.close()
+
+
+def serve(args):
+    host, port = args.address.rsplit(":", 1)
+    conn = Client(
+        (host, int(port)), authkey=bytes.fromhex(os.environ["VC_WORKER_AUTHKEY"])
+    )
+
+    try:
+        start = time.perf_counter()
+        from serving import load_engine
+
+        tf_import_s = time.perf_counter() - start
+        start = time.perf_counter()
+        engine = load_engine(
+            args.model,
+            backend=args.backend,
+            warmup_batch_sizes=(1, args.capacity),
+            threads=args.threads,
+        )
+        total = time.perf_counter() - start
+        if engine.input_size != tuple(args.size):
+            raise ValueError(
+                f"Modelo espera {engine.input_size}, pool alocado para {args.size}"
+            )
+    except Exception as exc:
+        conn.send(("error", args.index, repr(exc)))
+        return
+
+    # Ao se anexar, o processo registra os blocos no próprio resource tracker,
+    # que os apagaria na saída; quem cria e apaga os blocos é o processo pai.
+    shm_in, images = attach(args.input, (args.capacity, *engine.input_shape))
+    shm_out, preds = attach(args.output, (args.capacity, NUM_CLASSES))
+    for shm in (shm_in, shm_out):
+        resource_tracker.unregister(shm._name, "shared_memory")
+
+    conn.send(
+        (
+            "ready",
+            args.index,
+            {
+                "tf_import_s": tf_import_s,
+                "model_load_s": total - engine.warmup_s,
+                "warmup_s": engine.warmup_s,
+            },
+        )
+    )
+
+    while True:
+        try:
+            n = conn.recv()
+        except EOFError:
+            break
+        if n is None:
+            break
+        try:
+            preds[:n] = engine(images[:n])
+        except Exception as exc:
+            conn.send(("error", repr(exc)))
+        else:
+            conn.send(("ok", n))
+
+    shm_in.close()
+    shm_out.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Worker de inferência")
+    parser.add_argument("address")
+    parser.add_argument("--index", type=int, required=True)
+    parser.add_argument("--model", required=True)
+    parser.add_argument("--backend", default="keras")
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--capacity", type=int, required=True)
+    parser.add_argument("--size", type=int, nargs=2, required=True)
+    parser.add_argument("--input", required=True)
+    parser.add_argument("--output", required=True)
+    serve(parser.parse_args())